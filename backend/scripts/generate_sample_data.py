@@ -10,12 +10,13 @@ from pathlib import Path
 backend_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(backend_dir / "src"))
 
+import asyncio
 from decimal import Decimal
 import random
 from datetime import datetime, timedelta, timezone
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from src.data.database import get_session_sync, init_database
+from src.data.database import create_async_session, init_database
 from src.data.models import (
     Supplier, Location, Product, Inventory, Transaction, TransactionType
 )
@@ -198,7 +199,7 @@ PRODUCTS_DATA = [
 ]
 
 
-def create_sample_suppliers(session: Session) -> list[Supplier]:
+async def create_sample_suppliers(session: AsyncSession) -> list[Supplier]:
     """Create sample suppliers."""
     print("Creating sample suppliers...")
     supplier_service = SupplierService(session)
@@ -206,14 +207,14 @@ def create_sample_suppliers(session: Session) -> list[Supplier]:
     
     for supplier_data in SUPPLIERS_DATA:
         from src.data.models import SupplierCreate
-        supplier = supplier_service.create_supplier(SupplierCreate(**supplier_data))
+        supplier = await supplier_service.create_supplier(SupplierCreate(**supplier_data))
         suppliers.append(supplier)
         print(f"  ✓ Created supplier: {supplier.name}")
     
     return suppliers
 
 
-def create_sample_locations(session: Session) -> list[Location]:
+async def create_sample_locations(session: AsyncSession) -> list[Location]:
     """Create sample locations."""
     print("Creating sample locations...")
     location_service = LocationService(session)
@@ -221,14 +222,14 @@ def create_sample_locations(session: Session) -> list[Location]:
     
     for location_data in LOCATIONS_DATA:
         from src.data.models import LocationCreate
-        location = location_service.create_location(LocationCreate(**location_data))
+        location = await location_service.create_location(LocationCreate(**location_data))
         locations.append(location)
         print(f"  ✓ Created location: {location.name}")
     
     return locations
 
 
-def create_sample_products(session: Session, suppliers: list[Supplier]) -> list[Product]:
+async def create_sample_products(session: AsyncSession, suppliers: list[Supplier]) -> list[Product]:
     """Create sample products."""
     print("Creating sample products...")
     inventory_service = InventoryService(session)
@@ -240,14 +241,14 @@ def create_sample_products(session: Session, suppliers: list[Supplier]) -> list[
         supplier_id = suppliers[i % len(suppliers)].id
         product_data["supplier_id"] = supplier_id
         
-        product = inventory_service.create_product(ProductCreate(**product_data))
+        product = await inventory_service.create_product(ProductCreate(**product_data))
         products.append(product)
         print(f"  ✓ Created product: {product.sku} - {product.name}")
     
     return products
 
 
-def create_sample_inventory(session: Session, products: list[Product], locations: list[Location]) -> None:
+async def create_sample_inventory(session: AsyncSession, products: list[Product], locations: list[Location]) -> None:
     """Create sample inventory records with initial stock."""
     print("Creating sample inventory...")
     inventory_service = InventoryService(session)
@@ -259,7 +260,7 @@ def create_sample_inventory(session: Session, products: list[Product], locations
             reserved = random.randint(0, min(10, base_stock // 4))
             
             from src.data.models import InventoryUpdate
-            inventory_service.update_inventory(
+            await inventory_service.update_inventory(
                 product.id,
                 location.id,
                 InventoryUpdate(
@@ -270,7 +271,7 @@ def create_sample_inventory(session: Session, products: list[Product], locations
             print(f"  ✓ Set inventory for {product.sku} at {location.name}: {base_stock} on hand, {reserved} reserved")
 
 
-def create_sample_transactions(session: Session, products: list[Product], locations: list[Location]) -> None:
+async def create_sample_transactions(session: AsyncSession, products: list[Product], locations: list[Location]) -> None:
     """Create sample transaction history."""
     print("Creating sample transactions...")
     transaction_service = TransactionService(session)
@@ -330,11 +331,11 @@ def create_sample_transactions(session: Session, products: list[Product], locati
                     user_id="system"
                 )
                 
-                transaction = transaction_service.create_transaction(transaction_data)
+                transaction = await transaction_service.create_transaction(transaction_data)
                 # Set the created timestamp to our desired date
                 transaction.created_at = transaction_date
                 session.add(transaction)
-                session.commit()
+                await session.commit()
                 
                 print(f"  ✓ Created {trans_type.value} transaction: {product.sku} @ {location.name}, qty: {quantity}")
                 
@@ -344,18 +345,18 @@ def create_sample_transactions(session: Session, products: list[Product], locati
                 continue
 
 
-def update_supplier_performance(session: Session, suppliers: list[Supplier]) -> None:
+async def update_supplier_performance(session: AsyncSession, suppliers: list[Supplier]) -> None:
     """Update supplier performance ratings."""
     print("Updating supplier performance ratings...")
     supplier_service = SupplierService(session)
     
     for supplier in suppliers:
-        supplier_service.update_supplier_performance_rating(supplier.id)
-        updated_supplier = supplier_service.get_supplier(supplier.id)
+        await supplier_service.update_supplier_performance_rating(supplier.id)
+        updated_supplier = await supplier_service.get_supplier(supplier.id)
         print(f"  ✓ Updated {supplier.name}: rating = {updated_supplier.performance_rating}")
 
 
-def main():
+async def main():
     """Generate all sample data."""
     print("🚀 AI4SupplyChain Sample Data Generator")
     print("=" * 50)
@@ -365,15 +366,15 @@ def main():
     init_database()
     print("  ✓ Database initialized")
     
-    with get_session_sync() as session:
+    async with create_async_session() as session:
         try:
             # Create sample data in order
-            suppliers = create_sample_suppliers(session)
-            locations = create_sample_locations(session)
-            products = create_sample_products(session, suppliers)
-            create_sample_inventory(session, products, locations)
-            create_sample_transactions(session, products, locations)
-            update_supplier_performance(session, suppliers)
+            suppliers = await create_sample_suppliers(session)
+            locations = await create_sample_locations(session)
+            products = await create_sample_products(session, suppliers)
+            await create_sample_inventory(session, products, locations)
+            await create_sample_transactions(session, products, locations)
+            await update_supplier_performance(session, suppliers)
             
             print("\n" + "=" * 50)
             print("✅ Sample data generation completed successfully!")
@@ -390,4 +391,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
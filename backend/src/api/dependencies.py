@@ -3,9 +3,10 @@ Common dependencies for FastAPI endpoints.
 """
 from fastapi import Depends, HTTPException, Query
 from sqlmodel import Session
-from typing import Optional, Annotated
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import AsyncGenerator, Optional, Annotated
 
-from ..data.database import get_session
+from ..data.database import get_session, get_async_session
 from ..data.base import PaginationParams
 from ..services.inventory_service import InventoryService
 from ..services.transaction_service import TransactionService
@@ -27,23 +28,29 @@ def get_db_session():
             pass  # Expected when generator is exhausted
 
 
+async def get_async_db_session() -> AsyncGenerator[AsyncSession, None]:
+    """Get async database session dependency."""
+    async for session in get_async_session():
+        yield session
+
+
 # Service dependencies
-def get_inventory_service(session: Session = Depends(get_db_session)) -> InventoryService:
+def get_inventory_service(session: AsyncSession = Depends(get_async_db_session)) -> InventoryService:
     """Get inventory service dependency."""
     return InventoryService(session)
 
 
-def get_transaction_service(session: Session = Depends(get_db_session)) -> TransactionService:
+def get_transaction_service(session: AsyncSession = Depends(get_async_db_session)) -> TransactionService:
     """Get transaction service dependency."""
     return TransactionService(session)
 
 
-def get_supplier_service(session: Session = Depends(get_db_session)) -> SupplierService:
+def get_supplier_service(session: AsyncSession = Depends(get_async_db_session)) -> SupplierService:
     """Get supplier service dependency."""
     return SupplierService(session)
 
 
-def get_location_service(session: Session = Depends(get_db_session)) -> LocationService:
+def get_location_service(session: AsyncSession = Depends(get_async_db_session)) -> LocationService:
     """Get location service dependency."""
     return LocationService(session)
 
@@ -107,6 +114,7 @@ def handle_service_error(error: Exception, operation: str) -> HTTPException:
 
 # Type aliases for common dependencies
 DatabaseSession = Annotated[Session, Depends(get_db_session)]
+AsyncDatabaseSession = Annotated[AsyncSession, Depends(get_async_db_session)]
 InventoryServiceDep = Annotated[InventoryService, Depends(get_inventory_service)]
 TransactionServiceDep = Annotated[TransactionService, Depends(get_transaction_service)]
 SupplierServiceDep = Annotated[SupplierService, Depends(get_supplier_service)]
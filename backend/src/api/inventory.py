@@ -20,7 +20,7 @@ async def get_inventory(
 ):
     """Get inventory levels with optional filtering."""
     try:
-        inventory_records = service.get_inventory(
+        inventory_records = await service.get_inventory(
             product_id=product_id,
             location_id=location_id
         )
@@ -48,11 +48,11 @@ async def get_location_inventory(
 ):
     """Get all inventory for a specific location."""
     try:
-        inventory_records = service.get_inventory(location_id=location_id)
+        inventory_records = await service.get_inventory(location_id=location_id)
         
         result = []
         for inv in inventory_records:
-            product = service.get_product(inv.product_id)
+            product = await service.get_product(inv.product_id)
             if product:
                 result.append({
                     "id": inv.id,
@@ -74,15 +74,26 @@ async def get_location_inventory(
 
 
 @router.get("/alerts/low-stock", response_model=List[dict], summary="Get low stock alerts")
-async def get_low_stock_alerts(service: InventoryServiceDep = None):
+async def get_low_stock_alerts(
+    product_id: Optional[int] = Query(None, description="Only check this product"),
+    service: InventoryServiceDep = None
+):
     """Get products that need reordering."""
     try:
-        low_stock_products = service.get_low_stock_products()
+        low_stock_products = await service.get_low_stock_products(product_id=product_id)
+        # One query for every alerted product's inventory instead of two per product
+        inventory_by_product = await service.get_inventory_for_products([p.id for p in low_stock_products])
         
         alerts = []
         for product in low_stock_products:
-            total_available = service.get_total_available_quantity(product.id)
-            inventory_records = service.get_inventory(product_id=product.id)
+            locations = [
+                {
+                    "location_id": inv.location_id,
+                    "available": max(0, inv.quantity_on_hand - inv.reserved_quantity)
+                }
+                for inv in inventory_by_product[product.id]
+            ]
+            total_available = sum(location["available"] for location in locations)
             
             alerts.append({
                 "product_id": product.id,
@@ -94,13 +105,7 @@ async def get_low_stock_alerts(service: InventoryServiceDep = None):
                 "current_available": total_available,
                 "shortage": max(0, product.reorder_point - total_available),
                 "supplier_id": product.supplier_id,
-                "locations": [
-                    {
-                        "location_id": inv.location_id,
-                        "available": max(0, inv.quantity_on_hand - inv.reserved_quantity)
-                    }
-                    for inv in inventory_records
-                ]
+                "locations": locations
             })
         
         return alerts
@@ -112,7 +117,7 @@ async def get_low_stock_alerts(service: InventoryServiceDep = None):
 async def get_inventory_summary(service: InventoryServiceDep = None):
     """Get overall inventory summary statistics."""
     try:
-        all_inventory = service.get_inventory()
+        all_inventory = await service.get_inventory()
         
         total_products_with_stock = len(set(inv.product_id for inv in all_inventory if inv.quantity_on_hand > 0))
         total_quantity = sum(inv.quantity_on_hand for inv in all_inventory)
@@ -122,11 +127,11 @@ async def get_inventory_summary(service: InventoryServiceDep = None):
         # Calculate total value (need product costs)
         total_value = 0
         for inv in all_inventory:
-            product = service.get_product(inv.product_id)
+            product = await service.get_product(inv.product_id)
             if product and inv.quantity_on_hand > 0:
                 total_value += float(product.unit_cost * inv.quantity_on_hand)
         
-        low_stock_count = len(service.get_low_stock_products())
+        low_stock_count = len(await service.get_low_stock_products())
         
         return {
             "total_products_with_stock": total_products_with_stock,
@@ -150,7 +155,7 @@ async def update_inventory(
 ):
     """Update inventory quantities for a product at a location."""
     try:
-        inventory = service.update_inventory(product_id, location_id, inventory_data)
+        inventory = await service.update_inventory(product_id, location_id, inventory_data)
         if not inventory:
             raise HTTPException(
                 status_code=404, 
@@ -180,14 +185,14 @@ async def get_specific_inventory(
 ):
     """Get inventory for a specific product at a specific location."""
     try:
-        inventory = service.get_inventory_by_product_location(product_id, location_id)
+        inventory = await service.get_inventory_by_product_location(product_id, location_id)
         if not inventory:
             raise HTTPException(
                 status_code=404,
                 detail=f"Inventory not found for product {product_id} at location {location_id}"
             )
         
-        product = service.get_product(product_id)
+        product = await service.get_product(product_id)
         
         return {
             "id": inventory.id,
@@ -215,9 +220,9 @@ async def reserve_inventory(
 ):
     """Reserve inventory quantity."""
     try:
-        success = service.reserve_inventory(product_id, location_id, quantity)
+        success = await service.reserve_inventory(product_id, location_id, quantity)
         if not success:
-            available = service.get_available_quantity(product_id, location_id)
+            available = await service.get_available_quantity(product_id, location_id)
             raise HTTPException(
                 status_code=400,
                 detail=f"Cannot reserve {quantity} units. Available: {available}"
@@ -244,7 +249,7 @@ async def release_reservation(
 ):
     """Release reserved inventory."""
     try:
-        success = service.release_reservation(product_id, location_id, quantity)
+        success = await service.release_reservation(product_id, location_id, quantity)
         if not success:
             raise HTTPException(
                 status_code=404,
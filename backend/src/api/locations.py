@@ -21,7 +21,7 @@ async def create_location(
 ):
     """Create a new location."""
     try:
-        location = service.create_location(location_data)
+        location = await service.create_location(location_data)
         return LocationRead.model_validate(location.model_dump())
     except Exception as e:
         raise handle_service_error(e, "location creation")
@@ -37,7 +37,7 @@ async def list_locations(
     """List locations with optional filtering."""
     try:
         skip, limit = skip_limit
-        locations = service.list_locations(
+        locations = await service.list_locations(
             skip=skip,
             limit=limit,
             is_active=is_active,
@@ -52,7 +52,7 @@ async def list_locations(
 async def get_location_statistics(service: LocationServiceDep):
     """Get overall location statistics."""
     try:
-        return service.get_location_statistics()
+        return await service.get_location_statistics()
     except Exception as e:
         raise handle_service_error(e, "location statistics retrieval")
 
@@ -61,7 +61,7 @@ async def get_location_statistics(service: LocationServiceDep):
 async def get_warehouse_types(service: LocationServiceDep):
     """Get list of distinct warehouse types."""
     try:
-        return service.get_warehouse_types()
+        return await service.get_warehouse_types()
     except Exception as e:
         raise handle_service_error(e, "warehouse types retrieval")
 
@@ -70,7 +70,7 @@ async def get_warehouse_types(service: LocationServiceDep):
 async def get_empty_locations(service: LocationServiceDep):
     """Get locations with no inventory."""
     try:
-        locations = service.get_empty_locations()
+        locations = await service.get_empty_locations()
         return [LocationRead.model_validate(l.model_dump()) for l in locations]
     except Exception as e:
         raise handle_service_error(e, "empty locations retrieval")
@@ -84,7 +84,7 @@ async def get_low_activity_locations(
 ):
     """Get locations with low transaction activity."""
     try:
-        locations = service.get_locations_with_low_activity(days, min_transactions)
+        locations = await service.get_locations_with_low_activity(days, min_transactions)
         return [LocationRead.model_validate(l.model_dump()) for l in locations]
     except Exception as e:
         raise handle_service_error(e, "low activity locations retrieval")
@@ -97,7 +97,7 @@ async def get_location_by_name(
 ):
     """Get location by name."""
     try:
-        location = service.get_location_by_name(name)
+        location = await service.get_location_by_name(name)
         if not location:
             raise HTTPException(status_code=404, detail=f"Location with name '{name}' not found")
         return LocationRead.model_validate(location.model_dump())
@@ -114,7 +114,7 @@ async def get_location_by_code(
 ):
     """Get location by code."""
     try:
-        location = service.get_location_by_code(code)
+        location = await service.get_location_by_code(code)
         if not location:
             raise HTTPException(status_code=404, detail=f"Location with code '{code}' not found")
         return LocationRead.model_validate(location.model_dump())
@@ -131,7 +131,7 @@ async def get_location(
 ):
     """Get location by ID."""
     try:
-        location = service.get_location(location_id)
+        location = await service.get_location(location_id)
         if not location:
             raise HTTPException(status_code=404, detail=f"Location with ID {location_id} not found")
         return LocationRead.model_validate(location.model_dump())
@@ -149,7 +149,7 @@ async def update_location(
 ):
     """Update location."""
     try:
-        location = service.update_location(location_id, location_data)
+        location = await service.update_location(location_id, location_data)
         if not location:
             raise HTTPException(status_code=404, detail=f"Location with ID {location_id} not found")
         return LocationRead.model_validate(location.model_dump())
@@ -166,7 +166,7 @@ async def delete_location(
 ):
     """Deactivate location (soft delete)."""
     try:
-        success = service.delete_location(location_id)
+        success = await service.delete_location(location_id)
         if not success:
             raise HTTPException(status_code=404, detail=f"Location with ID {location_id} not found")
         return {"message": "Location deactivated successfully", "location_id": location_id}
@@ -183,7 +183,7 @@ async def delete_location_permanently(
 ):
     """Permanently delete location (hard delete). Only allowed if no inventory or transactions exist."""
     try:
-        success = service.delete_location_permanently(location_id)
+        success = await service.delete_location_permanently(location_id)
         if not success:
             raise HTTPException(status_code=404, detail=f"Location with ID {location_id} not found")
         return {"message": "Location permanently deleted", "location_id": location_id}
@@ -203,7 +203,7 @@ async def get_location_inventory_summary(
 ):
     """Get inventory summary for a location."""
     try:
-        return service.get_location_inventory_summary(location_id)
+        return await service.get_location_inventory_summary(location_id)
     except Exception as e:
         raise handle_service_error(e, "location inventory summary retrieval")
 
@@ -216,6 +216,6 @@ async def get_location_activity(
 ):
     """Get recent activity summary for a location."""
     try:
-        return service.get_location_activity(location_id, days)
+        return await service.get_location_activity(location_id, days)
     except Exception as e:
         raise handle_service_error(e, "location activity retrieval")
\ No newline at end of file
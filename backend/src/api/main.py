@@ -3,6 +3,7 @@ FastAPI main application for AI4SupplyChain inventory management.
 """
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from contextlib import asynccontextmanager
 import logging
 
@@ -14,6 +15,11 @@ from .suppliers import router as suppliers_router
 from .locations import router as locations_router
 from .transactions import router as transactions_router
 
+try:
+    import orjson
+except ImportError:  # optional (dev extra); fall back to the stdlib encoder
+    orjson = None
+
 # Configure logging
 logging.basicConfig(
     level=settings.log_level,
@@ -46,6 +52,8 @@ app = FastAPI(
     version=settings.api_version,
     description=settings.api_description,
     lifespan=lifespan,
+    # orjson encodes response bodies several times faster than the stdlib json module
+    default_response_class=ORJSONResponse if orjson else JSONResponse,
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json"
@@ -97,31 +105,27 @@ async def health_check():
 @app.get("/api/v1/stats", summary="System statistics")
 async def system_stats():
     """Get overall system statistics."""
-    from ..data.database import get_session
-    from ..services.inventory_service import InventoryService
+    from ..data.database import create_async_session
     from ..services.supplier_service import SupplierService
     from ..services.location_service import LocationService
     from sqlmodel import select, func
     from ..data.models import Product, Transaction
 
     try:
-        # Use proper session management with dependency injection pattern
-        session_gen = get_session()
-        session = next(session_gen)
-        try:
+        async with create_async_session() as session:
             # Get basic counts
-            total_products = session.exec(select(func.count(Product.id))).first()
-            active_products = session.exec(
+            total_products = (await session.exec(select(func.count(Product.id)))).first()
+            active_products = (await session.exec(
                 select(func.count(Product.id)).where(Product.is_active == True)
-            ).first()
-            total_transactions = session.exec(select(func.count(Transaction.id))).first()
+            )).first()
+            total_transactions = (await session.exec(select(func.count(Transaction.id)))).first()
 
             # Get service statistics
             supplier_service = SupplierService(session)
             location_service = LocationService(session)
 
-            supplier_stats = supplier_service.get_supplier_statistics()
-            location_stats = location_service.get_location_statistics()
+            supplier_stats = await supplier_service.get_supplier_statistics()
+            location_stats = await location_service.get_location_statistics()
 
             return {
                 "products": {
@@ -139,12 +143,6 @@ async def system_stats():
                     "allow_negative_inventory": settings.allow_negative_inventory,
                 }
             }
-        finally:
-            # Ensure session is properly closed
-            try:
-                next(session_gen)
-            except StopIteration:
-                pass
     except Exception as e:
         logger.error(f"Error getting system stats: {e}")
         raise HTTPException(status_code=500, detail="Error retrieving system statistics")
@@ -22,7 +22,7 @@ async def create_product(
 ):
     """Create a new product."""
     try:
-        product = service.create_product(product_data)
+        product = await service.create_product(product_data)
         return ProductRead.model_validate(product.model_dump())
     except Exception as e:
         raise handle_service_error(e, "product creation")
@@ -39,7 +39,7 @@ async def list_products(
     """List products with optional filtering."""
     try:
         skip, limit = skip_limit
-        products = service.list_products(
+        products = await service.list_products(
             skip=skip,
             limit=limit,
             category=category,
@@ -55,7 +55,7 @@ async def list_products(
 async def get_product_categories(service: InventoryServiceDep):
     """Get list of distinct product categories."""
     try:
-        return service.get_product_categories()
+        return await service.get_product_categories()
     except Exception as e:
         raise handle_service_error(e, "categories retrieval")
 
@@ -64,7 +64,7 @@ async def get_product_categories(service: InventoryServiceDep):
 async def get_low_stock_products(service: InventoryServiceDep):
     """Get products with stock levels below reorder point."""
     try:
-        products = service.get_low_stock_products()
+        products = await service.get_low_stock_products()
         return [ProductRead.model_validate(p.model_dump()) for p in products]
     except Exception as e:
         raise handle_service_error(e, "low stock products retrieval")
@@ -77,7 +77,7 @@ async def get_product_by_sku(
 ):
     """Get product by SKU."""
     try:
-        product = service.get_product_by_sku(sku)
+        product = await service.get_product_by_sku(sku)
         if not product:
             raise HTTPException(status_code=404, detail=f"Product with SKU '{sku}' not found")
         return ProductRead.model_validate(product.model_dump())
@@ -94,7 +94,7 @@ async def get_product(
 ):
     """Get product by ID."""
     try:
-        product = service.get_product(product_id)
+        product = await service.get_product(product_id)
         if not product:
             raise HTTPException(status_code=404, detail=f"Product with ID {product_id} not found")
         return ProductRead.model_validate(product.model_dump())
@@ -112,7 +112,7 @@ async def update_product(
 ):
     """Update product."""
     try:
-        product = service.update_product(product_id, product_data)
+        product = await service.update_product(product_id, product_data)
         if not product:
             raise HTTPException(status_code=404, detail=f"Product with ID {product_id} not found")
         return ProductRead.model_validate(product.model_dump())
@@ -129,7 +129,7 @@ async def delete_product(
 ):
     """Deactivate product (soft delete)."""
     try:
-        success = service.delete_product(product_id)
+        success = await service.delete_product(product_id)
         if not success:
             raise HTTPException(status_code=404, detail=f"Product with ID {product_id} not found")
         return {"message": "Product deactivated successfully", "product_id": product_id}
@@ -146,7 +146,7 @@ async def delete_product_permanently(
 ):
     """Permanently delete product (hard delete). Only allowed if no transactions or inventory exist."""
     try:
-        success = service.delete_product_permanently(product_id)
+        success = await service.delete_product_permanently(product_id)
         if not success:
             raise HTTPException(status_code=404, detail=f"Product with ID {product_id} not found")
         return {"message": "Product permanently deleted", "product_id": product_id}
@@ -167,15 +167,15 @@ async def get_product_inventory(
     """Get inventory levels for a product across all locations."""
     try:
         # First check if product exists
-        product = service.get_product(product_id)
+        product = await service.get_product(product_id)
         if not product:
             raise HTTPException(status_code=404, detail=f"Product with ID {product_id} not found")
         
-        inventory_records = service.get_inventory(product_id=product_id)
+        inventory_records = await service.get_inventory(product_id=product_id)
         
         total_on_hand = sum(inv.quantity_on_hand for inv in inventory_records)
         total_reserved = sum(inv.reserved_quantity for inv in inventory_records)
-        total_available = service.get_total_available_quantity(product_id)
+        total_available = await service.get_total_available_quantity(product_id)
         
         return {
             "product_id": product_id,
@@ -2,10 +2,10 @@
 Supplier management API endpoints.
 """
 from fastapi import APIRouter, HTTPException, Query, Path
-from typing import List, Optional
+from typing import List, Optional, Union
 
 from ..data.models import (
-    Supplier, SupplierCreate, SupplierUpdate, SupplierRead
+    Supplier, SupplierCreate, SupplierUpdate, SupplierRead, SupplierFieldsRead, ProductRead
 )
 from .dependencies import (
     SupplierServiceDep, SkipLimitDep, handle_service_error
@@ -21,28 +21,39 @@ async def create_supplier(
 ):
     """Create a new supplier."""
     try:
-        supplier = service.create_supplier(supplier_data)
+        supplier = await service.create_supplier(supplier_data)
         return SupplierRead.model_validate(supplier.model_dump())
     except Exception as e:
         raise handle_service_error(e, "supplier creation")
 
 
-@router.get("/", response_model=List[SupplierRead], summary="List suppliers")
+@router.get(
+    "/",
+    # Rows projected with ``fields`` only carry the requested keys
+    response_model=List[Union[SupplierRead, SupplierFieldsRead]],
+    response_model_exclude_unset=True,
+    summary="List suppliers"
+)
 async def list_suppliers(
     skip_limit: SkipLimitDep,
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
     min_rating: Optional[float] = Query(None, ge=0, le=5, description="Minimum performance rating"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name"),
     service: SupplierServiceDep = None
 ):
     """List suppliers with optional filtering."""
     try:
         skip, limit = skip_limit
-        suppliers = service.list_suppliers(
+        field_names = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+        suppliers = await service.list_suppliers(
             skip=skip,
             limit=limit,
             is_active=is_active,
-            min_rating=min_rating
+            min_rating=min_rating,
+            fields=field_names
         )
+        if field_names:
+            return [SupplierFieldsRead(**row) for row in suppliers]
         return [SupplierRead.model_validate(s.model_dump()) for s in suppliers]
     except Exception as e:
         raise handle_service_error(e, "supplier listing")
@@ -52,7 +63,7 @@ async def list_suppliers(
 async def get_supplier_statistics(service: SupplierServiceDep):
     """Get overall supplier statistics."""
     try:
-        return service.get_supplier_statistics()
+        return await service.get_supplier_statistics()
     except Exception as e:
         raise handle_service_error(e, "supplier statistics retrieval")
 
@@ -61,7 +72,7 @@ async def get_supplier_statistics(service: SupplierServiceDep):
 async def update_all_performance_ratings(service: SupplierServiceDep):
     """Update performance ratings for all active suppliers."""
     try:
-        updated_count = service.bulk_update_performance_ratings()
+        updated_count = await service.bulk_update_performance_ratings()
         return {
             "message": f"Updated performance ratings for {updated_count} suppliers",
             "updated_count": updated_count
@@ -71,10 +82,13 @@ async def update_all_performance_ratings(service: SupplierServiceDep):
 
 
 @router.get("/review-needed", response_model=List[SupplierRead], summary="Get suppliers needing review")
-async def get_suppliers_needing_review(service: SupplierServiceDep):
+async def get_suppliers_needing_review(
+    name_contains: Optional[str] = Query(None, description="Only suppliers whose name contains this text"),
+    service: SupplierServiceDep = None
+):
     """Get suppliers that might need performance review."""
     try:
-        suppliers = service.get_suppliers_needing_review()
+        suppliers = await service.get_suppliers_needing_review(name_contains=name_contains)
         return [SupplierRead.model_validate(s.model_dump()) for s in suppliers]
     except Exception as e:
         raise handle_service_error(e, "suppliers needing review retrieval")
@@ -87,7 +101,7 @@ async def get_supplier_by_name(
 ):
     """Get supplier by name."""
     try:
-        supplier = service.get_supplier_by_name(name)
+        supplier = await service.get_supplier_by_name(name)
         if not supplier:
             raise HTTPException(status_code=404, detail=f"Supplier with name '{name}' not found")
         return SupplierRead.model_validate(supplier.model_dump())
@@ -104,7 +118,7 @@ async def get_supplier(
 ):
     """Get supplier by ID."""
     try:
-        supplier = service.get_supplier(supplier_id)
+        supplier = await service.get_supplier(supplier_id)
         if not supplier:
             raise HTTPException(status_code=404, detail=f"Supplier with ID {supplier_id} not found")
         return SupplierRead.model_validate(supplier.model_dump())
@@ -122,7 +136,7 @@ async def update_supplier(
 ):
     """Update supplier."""
     try:
-        supplier = service.update_supplier(supplier_id, supplier_data)
+        supplier = await service.update_supplier(supplier_id, supplier_data)
         if not supplier:
             raise HTTPException(status_code=404, detail=f"Supplier with ID {supplier_id} not found")
         return SupplierRead.model_validate(supplier.model_dump())
@@ -139,10 +153,15 @@ async def delete_supplier(
 ):
     """Deactivate supplier (soft delete)."""
     try:
-        success = service.delete_supplier(supplier_id)
-        if not success:
+        supplier = await service.delete_supplier(supplier_id)
+        if not supplier:
             raise HTTPException(status_code=404, detail=f"Supplier with ID {supplier_id} not found")
-        return {"message": "Supplier deactivated successfully", "supplier_id": supplier_id}
+        return {
+            "message": "Supplier deactivated successfully",
+            "supplier_id": supplier_id,
+            # The deactivated row, so callers need not fetch it again
+            "supplier": SupplierRead.model_validate(supplier.model_dump())
+        }
     except HTTPException:
         raise
     except Exception as e:
@@ -156,7 +175,7 @@ async def delete_supplier_permanently(
 ):
     """Permanently delete supplier (hard delete). Only allowed if no products or transactions exist."""
     try:
-        success = service.delete_supplier_permanently(supplier_id)
+        success = await service.delete_supplier_permanently(supplier_id)
         if not success:
             raise HTTPException(status_code=404, detail=f"Supplier with ID {supplier_id} not found")
         return {"message": "Supplier permanently deleted", "supplier_id": supplier_id}
@@ -178,11 +197,10 @@ async def get_supplier_products(
     """Get all products from a supplier."""
     try:
         if active_only:
-            products = service.get_supplier_active_products(supplier_id)
+            products = await service.get_supplier_active_products(supplier_id)
         else:
-            products = service.get_supplier_products(supplier_id)
+            products = await service.get_supplier_products(supplier_id)
         
-        from ..data.models import ProductRead
         return [ProductRead.model_validate(p.model_dump()) for p in products]
     except Exception as e:
         raise handle_service_error(e, "supplier products retrieval")
@@ -195,11 +213,11 @@ async def get_supplier_performance(
 ):
     """Get detailed performance metrics for a supplier."""
     try:
-        supplier = service.get_supplier(supplier_id)
+        supplier = await service.get_supplier(supplier_id)
         if not supplier:
             raise HTTPException(status_code=404, detail=f"Supplier with ID {supplier_id} not found")
         
-        performance_metrics = service.calculate_supplier_performance(supplier_id)
+        performance_metrics = await service.calculate_supplier_performance(supplier_id)
         
         # Include supplier's current performance rating
         performance_metrics["performance_rating"] = supplier.performance_rating
@@ -220,13 +238,13 @@ async def update_supplier_performance(
     """Update supplier's performance rating."""
     try:
         # Update the supplier's performance rating
-        supplier = service.get_supplier(supplier_id)
+        supplier = await service.get_supplier(supplier_id)
         if not supplier:
             raise HTTPException(status_code=404, detail=f"Supplier with ID {supplier_id} not found")
         
         # Update the rating
         update_data = SupplierUpdate(performance_rating=new_rating)
-        updated_supplier = service.update_supplier(supplier_id, update_data)
+        updated_supplier = await service.update_supplier(supplier_id, update_data)
         
         return {
             "message": "Performance rating updated successfully",
@@ -6,7 +6,7 @@ from typing import List, Optional
 from datetime import datetime
 
 from ..data.models import (
-    Transaction, TransactionCreate, TransactionRead, TransactionType
+    Transaction, TransactionCreate, TransactionRead, TransactionType, TransferRead
 )
 from .dependencies import (
     TransactionServiceDep, SkipLimitDep, handle_service_error
@@ -22,7 +22,7 @@ async def create_transaction(
 ):
     """Create and process a new transaction."""
     try:
-        transaction = service.create_transaction(transaction_data)
+        transaction = await service.create_transaction(transaction_data)
         return TransactionRead(
             id=transaction.id,
             product_id=transaction.product_id,
@@ -45,7 +45,7 @@ async def create_bulk_transactions(
 ):
     """Create multiple transactions in a single batch."""
     try:
-        transactions = service.create_bulk_transactions(transactions_data)
+        transactions = await service.create_bulk_transactions(transactions_data)
         return [
             TransactionRead(
                 id=t.id,
@@ -72,12 +72,13 @@ async def list_transactions(
     reference_number: Optional[str] = Query(None, description="Filter by reference number"),
     start_date: Optional[datetime] = Query(None, description="Filter by start date (ISO format)"),
     end_date: Optional[datetime] = Query(None, description="Filter by end date (ISO format)"),
+    after_id: Optional[int] = Query(None, description="Return the page after this transaction ID (keyset pagination)"),
     service: TransactionServiceDep = None
 ):
     """List transactions with optional filtering."""
     try:
         skip, limit = skip_limit
-        transactions = service.list_transactions(
+        transactions = await service.list_transactions(
             skip=skip,
             limit=limit,
             product_id=product_id,
@@ -85,7 +86,8 @@ async def list_transactions(
             transaction_type=transaction_type,
             reference_number=reference_number,
             start_date=start_date,
-            end_date=end_date
+            end_date=end_date,
+            after_id=after_id
         )
         return [
             TransactionRead(
@@ -98,7 +100,7 @@ async def list_transactions(
                 notes=t.notes,
                 user_id=t.user_id,
                 created_at=t.created_at
-            ) for t in transactions
+            ) async for t in transactions
         ]
     except Exception as e:
         raise handle_service_error(e, "transaction listing")
@@ -114,7 +116,7 @@ async def get_transaction_summary(
 ):
     """Get transaction summary statistics."""
     try:
-        return service.get_transaction_summary(
+        return await service.get_transaction_summary(
             product_id=product_id,
             location_id=location_id,
             start_date=start_date,
@@ -136,7 +138,7 @@ async def process_stock_receipt(
 ):
     """Process stock receipt (IN transaction)."""
     try:
-        transaction = service.process_stock_receipt(
+        transaction = await service.process_stock_receipt(
             product_id=product_id,
             location_id=location_id,
             quantity=quantity,
@@ -171,7 +173,7 @@ async def process_stock_shipment(
 ):
     """Process stock shipment (OUT transaction)."""
     try:
-        transaction = service.process_stock_shipment(
+        transaction = await service.process_stock_shipment(
             product_id=product_id,
             location_id=location_id,
             quantity=quantity,
@@ -194,7 +196,7 @@ async def process_stock_shipment(
         raise handle_service_error(e, "stock shipment processing")
 
 
-@router.post("/transfer", response_model=List[TransactionRead], summary="Process stock transfer")
+@router.post("/transfer", response_model=TransferRead, summary="Process stock transfer")
 async def process_stock_transfer(
     product_id: int = Query(..., description="Product ID"),
     from_location_id: int = Query(..., description="Source location ID"),
@@ -207,7 +209,7 @@ async def process_stock_transfer(
 ):
     """Process stock transfer between locations."""
     try:
-        transactions = service.process_stock_transfer(
+        out_transaction, in_transaction = await service.process_stock_transfer(
             product_id=product_id,
             from_location_id=from_location_id,
             to_location_id=to_location_id,
@@ -216,19 +218,10 @@ async def process_stock_transfer(
             notes=notes,
             user_id=user_id
         )
-        return [
-            TransactionRead(
-                id=t.id,
-                product_id=t.product_id,
-                location_id=t.location_id,
-                transaction_type=t.transaction_type,
-                quantity=t.quantity,
-                reference_number=t.reference_number,
-                notes=t.notes,
-                user_id=t.user_id,
-                created_at=t.created_at
-            ) for t in transactions
-        ]
+        return TransferRead(
+            out_transaction=TransactionRead.model_validate(out_transaction.model_dump()),
+            in_transaction=TransactionRead.model_validate(in_transaction.model_dump())
+        )
     except Exception as e:
         raise handle_service_error(e, "stock transfer processing")
 
@@ -244,7 +237,7 @@ async def process_stock_adjustment(
 ):
     """Process stock adjustment (ADJUSTMENT transaction)."""
     try:
-        transaction = service.process_stock_adjustment(
+        transaction = await service.process_stock_adjustment(
             product_id=product_id,
             location_id=location_id,
             adjustment_quantity=adjustment_quantity,
@@ -273,7 +266,7 @@ async def get_transaction(
 ):
     """Get transaction by ID."""
     try:
-        transaction = service.get_transaction(transaction_id)
+        transaction = await service.get_transaction(transaction_id)
         if not transaction:
             raise HTTPException(status_code=404, detail=f"Transaction with ID {transaction_id} not found")
         return TransactionRead(
@@ -301,20 +294,8 @@ async def get_product_transaction_history(
 ):
     """Get transaction history for a specific product."""
     try:
-        transactions = service.get_product_transaction_history(product_id, limit)
-        return [
-            TransactionRead(
-                id=t.id,
-                product_id=t.product_id,
-                location_id=t.location_id,
-                transaction_type=t.transaction_type,
-                quantity=t.quantity,
-                reference_number=t.reference_number,
-                notes=t.notes,
-                user_id=t.user_id,
-                created_at=t.created_at
-            ) for t in transactions
-        ]
+        rows = await service.get_product_transaction_history(product_id, limit, scalar=False)
+        return [TransactionRead(**row) for row in rows]
     except Exception as e:
         raise handle_service_error(e, "product transaction history retrieval")
 
@@ -327,19 +308,7 @@ async def get_location_transaction_history(
 ):
     """Get transaction history for a specific location."""
     try:
-        transactions = service.get_location_transaction_history(location_id, limit)
-        return [
-            TransactionRead(
-                id=t.id,
-                product_id=t.product_id,
-                location_id=t.location_id,
-                transaction_type=t.transaction_type,
-                quantity=t.quantity,
-                reference_number=t.reference_number,
-                notes=t.notes,
-                user_id=t.user_id,
-                created_at=t.created_at
-            ) for t in transactions
-        ]
+        rows = await service.get_location_transaction_history(location_id, limit, scalar=False)
+        return [TransactionRead(**row) for row in rows]
     except Exception as e:
         raise handle_service_error(e, "location transaction history retrieval")
\ No newline at end of file
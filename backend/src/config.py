@@ -20,6 +20,7 @@ class Settings(BaseSettings):
     database_pool_timeout: int = 30  # Timeout for getting connection from pool
     database_pool_recycle: int = 3600  # Recycle connections after 1 hour
     database_pool_pre_ping: bool = True  # Validate connections before use
+    database_insertmanyvalues_page_size: int = 1000  # Rows per multi-VALUES INSERT batch
     
     # API Configuration
     api_host: str = "0.0.0.0"
@@ -1,14 +1,21 @@
 """
 Database setup and connection management.
 """
-from sqlmodel import SQLModel, create_engine, Session
-from sqlalchemy import event, text
-from sqlalchemy.engine import Engine
+from sqlmodel import SQLModel, create_engine, Session, select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import case, event, insert, text
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.dialects.sqlite.aiosqlite import AsyncAdapt_aiosqlite_connection
+import asyncio
 import sqlite3
-from typing import Generator
+from typing import AsyncGenerator, Generator, List
 import logging
 
 from ..config import settings, get_database_url
+from .models import Transaction, TransactionAggregate
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -21,6 +28,8 @@ engine_kwargs = {
     "pool_timeout": settings.database_pool_timeout,
     "pool_recycle": settings.database_pool_recycle,
     "pool_pre_ping": settings.database_pool_pre_ping,
+    # Bulk INSERT ... RETURNING executemany is sent as multi-VALUES pages of this size
+    "insertmanyvalues_page_size": settings.database_insertmanyvalues_page_size,
 }
 
 # SQLite specific configuration
@@ -37,13 +46,43 @@ else:
                 f"overflow={settings.database_max_overflow}, "
                 f"timeout={settings.database_pool_timeout}")
 
-engine = create_engine(get_database_url(), **engine_kwargs)
+
+def _database_url() -> URL:
+    """Parse the configured database URL, accepting the legacy ``postgres://`` scheme."""
+    url = make_url(get_database_url())
+    # Many hosting providers still hand out postgres:// URLs, which SQLAlchemy rejects
+    if url.get_backend_name() == "postgres":
+        url = url.set(drivername=url.drivername.replace("postgres", "postgresql", 1))
+    return url
+
+
+engine = create_engine(_database_url(), **engine_kwargs)
+
+
+# Async driver used for each backend when the configured URL names a sync one
+_async_drivers = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+# Drivers that already work with create_async_engine (psycopg 3 does both)
+_async_capable_drivers = {"aiosqlite", "asyncpg", "psycopg"}
+
+
+def get_async_database_url() -> str:
+    """Get the database URL with the async driver for the configured backend."""
+    url = _database_url()
+    backend = url.get_backend_name()
+    driver = url.drivername.partition("+")[2]
+    if backend in _async_drivers and driver not in _async_capable_drivers:
+        url = url.set(drivername=f"{backend}+{_async_drivers[backend]}")
+    return url.render_as_string(hide_password=False)
+
+
+# Async engine shares the same pool configuration as the sync engine
+async_engine = create_async_engine(get_async_database_url(), **engine_kwargs)
 
 
 @event.listens_for(Engine, "connect")
 def set_sqlite_pragma(dbapi_connection, connection_record):
     """Enable foreign key constraints for SQLite."""
-    if isinstance(dbapi_connection, sqlite3.Connection):
+    if isinstance(dbapi_connection, (sqlite3.Connection, AsyncAdapt_aiosqlite_connection)):
         cursor = dbapi_connection.cursor()
         cursor.execute("PRAGMA foreign_keys=ON")
         cursor.close()
@@ -53,12 +92,63 @@ def create_db_and_tables() -> None:
     """Create database tables."""
     try:
         SQLModel.metadata.create_all(engine)
+        create_missing_indexes()
+        backfill_transaction_aggregates()
         logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Error creating database tables: {e}")
         raise
 
 
+def create_missing_indexes() -> None:
+    """Create model indexes that an existing database does not have yet.
+
+    create_all() skips tables that already exist, so indexes added to the
+    models later would never reach existing databases without this. A unique
+    index that existing rows violate is skipped with an error logged, so startup
+    still succeeds; it is created on the next start once the rows are merged.
+    """
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(engine, checkfirst=True)
+            except IntegrityError:
+                if not index.unique:
+                    raise
+                columns = ", ".join(column.name for column in index.columns)
+                logger.error(
+                    f"Skipped unique index {index.name}: table {table.name} has rows "
+                    f"with duplicate ({columns}). Merge them into one row each and "
+                    "restart to create the index."
+                )
+
+
+def backfill_transaction_aggregates() -> None:
+    """Build the running transaction totals for a database that predates them.
+
+    The totals are maintained on every transaction write afterwards, so this
+    only does work while the aggregate table is still empty.
+    """
+    with Session(engine) as session:
+        if session.exec(select(TransactionAggregate.id).limit(1)).first() is not None:
+            return
+        
+        totals = select(
+            Transaction.product_id,
+            Transaction.location_id,
+            Transaction.transaction_type,
+            func.count(),
+            func.sum(case((Transaction.quantity > 0, Transaction.quantity), else_=0)),
+            func.sum(case((Transaction.quantity < 0, Transaction.quantity), else_=0))
+        ).group_by(Transaction.product_id, Transaction.location_id, Transaction.transaction_type)
+        session.exec(insert(TransactionAggregate).from_select(
+            ["product_id", "location_id", "transaction_type",
+             "transaction_count", "quantity_in", "quantity_out"],
+            totals
+        ))
+        session.commit()
+
+
 def get_session() -> Generator[Session, None, None]:
     """Dependency to get database session."""
     with Session(engine) as session:
@@ -77,6 +167,43 @@ def get_session_sync() -> Session:
     return Session(engine)
 
 
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency to get async database session."""
+    async with create_async_session() as session:
+        try:
+            yield session
+        except Exception as e:
+            await session.rollback()
+            logger.error(f"Database session error: {e}")
+            raise
+
+
+def create_async_session() -> AsyncSession:
+    """Create a standalone async database session."""
+    # Keep attributes loaded after commit; async sessions cannot lazy-load on access
+    return AsyncSession(async_engine, expire_on_commit=False)
+
+
+async def gather_queries(session: AsyncSession, *queries) -> List[list]:
+    """Run independent read-only queries and return their rows in order.
+    
+    When the session is bound to an engine, the queries run concurrently, each on
+    its own short-lived session from the engine's pool (one AsyncSession cannot run
+    statements concurrently). A session bound to a single connection, such as a
+    test's rollback connection, or an engine whose pool hands out one shared
+    connection, runs them one after another on ``session`` instead.
+    """
+    engine = session.bind
+    if not isinstance(engine, AsyncEngine) or isinstance(engine.pool, StaticPool):
+        return [list(await session.exec(query)) for query in queries]
+    
+    async def fetch_all(query) -> list:
+        async with AsyncSession(engine, expire_on_commit=False) as query_session:
+            return list(await query_session.exec(query))
+
+    return await asyncio.gather(*(fetch_all(query) for query in queries))
+
+
 # Database health check
 def check_database_health() -> bool:
     """Check if database is accessible."""
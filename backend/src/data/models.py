@@ -5,6 +5,7 @@ from datetime import datetime, timezone
 from decimal import Decimal
 from enum import Enum
 from typing import Optional, List
+from sqlalchemy import Index, UniqueConstraint
 from sqlmodel import SQLModel, Field, Relationship
 
 
@@ -44,6 +45,11 @@ class Supplier(SQLModel, table=True):
     
     # Relationships
     products: List["Product"] = Relationship(back_populates="supplier")
+    
+    # Backs active-supplier rating filters and ordering
+    __table_args__ = (
+        Index("ix_supplier_active_rating", "is_active", "performance_rating"),
+    )
 
 
 class Location(SQLModel, table=True):
@@ -104,6 +110,11 @@ class Product(SQLModel, table=True):
     # Relationships
     inventory_records: List["Inventory"] = Relationship(back_populates="product")
     transactions: List["Transaction"] = Relationship(back_populates="product")
+    
+    # Backs per-supplier product lookups filtered by status
+    __table_args__ = (
+        Index("ix_product_supplier_active", "supplier_id", "is_active"),
+    )
 
 
 class Inventory(SQLModel, table=True):
@@ -127,8 +138,12 @@ class Inventory(SQLModel, table=True):
     product: Product = Relationship(back_populates="inventory_records")
     location: Location = Relationship(back_populates="inventory_records")
     
-    # Ensure unique product-location combination
-    __table_args__ = {"sqlite_autoincrement": True}
+    # Ensure unique product-location combination; also the index for single-row lookups
+    __table_args__ = (
+        Index("ix_inv_prod_loc", "product_id", "location_id", unique=True),
+        Index("ix_inv_loc_qty", "location_id", "quantity_on_hand"),
+        {"sqlite_autoincrement": True},
+    )
 
 
 class Transaction(SQLModel, table=True):
@@ -154,6 +169,39 @@ class Transaction(SQLModel, table=True):
     # Relationships
     product: Product = Relationship(back_populates="transactions")
     location: Location = Relationship(back_populates="transactions")
+    
+    # Back per-product/per-location history (newest first) and reference lookups
+    __table_args__ = (
+        Index("ix_txn_loc_time", "location_id", "created_at"),
+        # Also covers date-filtered per-product summaries, which then never read the table
+        Index("ix_txn_prod_summary", "product_id", "created_at", "transaction_type", "quantity"),
+        # Only ever matched by equality, so PostgreSQL can use a smaller hash index
+        Index("ix_txn_ref", "reference_number", postgresql_using="hash"),
+    )
+
+
+class TransactionAggregate(SQLModel, table=True):
+    """Running transaction totals per product, location and transaction type.
+    
+    Maintained alongside every transaction write so summaries do not scan history.
+    """
+    __tablename__ = "transaction_aggregates"
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    
+    product_id: int = Field(foreign_key="products.id")
+    location_id: int = Field(foreign_key="locations.id")
+    transaction_type: TransactionType
+    
+    # Totals
+    transaction_count: int = Field(default=0, ge=0)
+    quantity_in: int = Field(default=0, ge=0, description="Sum of positive quantities")
+    quantity_out: int = Field(default=0, le=0, description="Sum of negative quantities")
+    
+    # Conflict target of the upsert on each write; also serves product-filtered reads
+    __table_args__ = (
+        UniqueConstraint("product_id", "location_id", "transaction_type", name="uq_txn_agg_key"),
+    )
 
 
 # API Response Models (not tables)
@@ -224,6 +272,23 @@ class SupplierRead(SQLModel):
     updated_at: datetime
 
 
+class SupplierFieldsRead(SQLModel):
+    """Supplier data for API responses limited to the requested ``fields``."""
+    id: Optional[int] = None
+    name: Optional[str] = None
+    contact_person: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    address: Optional[str] = None
+    lead_time_days: Optional[int] = None
+    payment_terms: Optional[str] = None
+    minimum_order_qty: Optional[int] = None
+    is_active: Optional[bool] = None
+    performance_rating: Optional[float] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
 class SupplierCreate(SQLModel):
     """Supplier data for creation."""
     name: str
@@ -310,6 +375,12 @@ class TransactionRead(SQLModel):
     created_at: datetime
 
 
+class TransferRead(SQLModel):
+    """Both legs of a stock transfer for API responses."""
+    out_transaction: TransactionRead
+    in_transaction: TransactionRead
+
+
 class TransactionCreate(SQLModel):
     """Transaction data for creation."""
     product_id: int
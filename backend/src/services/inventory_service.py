@@ -2,14 +2,16 @@
 Inventory service for product and stock management operations.
 """
 from datetime import datetime, timezone
-from typing import List, Optional
-from sqlmodel import Session, select, and_
+from typing import Dict, List, Optional
+from sqlmodel import select, and_
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import case, update
 from decimal import Decimal
 
 from ..data.models import (
     Product, ProductCreate, ProductUpdate, ProductRead,
     Inventory, InventoryUpdate, InventoryRead,
-    Location, Supplier
+    Location, Supplier, Transaction
 )
 from ..config import settings
 import logging
@@ -20,51 +22,51 @@ logger = logging.getLogger(__name__)
 class InventoryService:
     """Service for inventory and product management."""
     
-    def __init__(self, session: Session):
+    def __init__(self, session: AsyncSession):
         self.session = session
     
     # Product CRUD operations
     
-    def create_product(self, product_data: ProductCreate) -> Product:
+    async def create_product(self, product_data: ProductCreate) -> Product:
         """Create a new product."""
         # Check if SKU already exists
-        existing = self.session.exec(
+        existing = (await self.session.exec(
             select(Product).where(Product.sku == product_data.sku)
-        ).first()
+        )).first()
         
         if existing:
             raise ValueError(f"Product with SKU '{product_data.sku}' already exists")
         
         # Validate supplier if provided
         if product_data.supplier_id:
-            supplier = self.session.get(Supplier, product_data.supplier_id)
+            supplier = await self.session.get(Supplier, product_data.supplier_id)
             if not supplier or not supplier.is_active:
                 raise ValueError(f"Invalid or inactive supplier ID: {product_data.supplier_id}")
         
         # Create product
         product = Product.model_validate(product_data.model_dump())
         self.session.add(product)
-        self.session.commit()
-        self.session.refresh(product)
+        await self.session.commit()
+        await self.session.refresh(product)
         
         # Auto-create inventory records if enabled
         if settings.auto_create_inventory_records:
-            self._create_initial_inventory_records(product.id)
+            await self._create_initial_inventory_records(product.id)
         
         logger.info(f"Created product: {product.sku} - {product.name}")
         return product
     
-    def get_product(self, product_id: int) -> Optional[Product]:
+    async def get_product(self, product_id: int) -> Optional[Product]:
         """Get product by ID."""
-        return self.session.get(Product, product_id)
+        return await self.session.get(Product, product_id)
     
-    def get_product_by_sku(self, sku: str) -> Optional[Product]:
+    async def get_product_by_sku(self, sku: str) -> Optional[Product]:
         """Get product by SKU."""
-        return self.session.exec(
+        return (await self.session.exec(
             select(Product).where(Product.sku == sku)
-        ).first()
+        )).first()
     
-    def list_products(
+    async def list_products(
         self, 
         skip: int = 0, 
         limit: int = 50,
@@ -83,17 +85,17 @@ class InventoryService:
             query = query.where(Product.supplier_id == supplier_id)
         
         query = query.offset(skip).limit(limit)
-        return list(self.session.exec(query))
+        return list(await self.session.exec(query))
     
-    def update_product(self, product_id: int, product_data: ProductUpdate) -> Optional[Product]:
+    async def update_product(self, product_id: int, product_data: ProductUpdate) -> Optional[Product]:
         """Update product."""
-        product = self.session.get(Product, product_id)
+        product = await self.session.get(Product, product_id)
         if not product:
             return None
         
         # Validate supplier if being updated
         if product_data.supplier_id:
-            supplier = self.session.get(Supplier, product_data.supplier_id)
+            supplier = await self.session.get(Supplier, product_data.supplier_id)
             if not supplier or not supplier.is_active:
                 raise ValueError(f"Invalid or inactive supplier ID: {product_data.supplier_id}")
         
@@ -104,41 +106,40 @@ class InventoryService:
         
         product.updated_at = datetime.now(timezone.utc)
         self.session.add(product)
-        self.session.commit()
-        self.session.refresh(product)
+        await self.session.commit()
+        await self.session.refresh(product)
         
         logger.info(f"Updated product: {product.sku}")
         return product
     
-    def delete_product(self, product_id: int) -> bool:
+    async def delete_product(self, product_id: int) -> bool:
         """Soft delete product (deactivate)."""
-        product = self.session.get(Product, product_id)
+        product = await self.session.get(Product, product_id)
         if not product:
             return False
 
         product.is_active = False
         product.updated_at = datetime.now(timezone.utc)
         self.session.add(product)
-        self.session.commit()
+        await self.session.commit()
 
         logger.info(f"Deactivated product: {product.sku}")
         return True
 
-    def delete_product_permanently(self, product_id: int) -> bool:
+    async def delete_product_permanently(self, product_id: int) -> bool:
         """Hard delete product (permanently remove from database)."""
-        product = self.session.get(Product, product_id)
+        product = await self.session.get(Product, product_id)
         if not product:
             return False
 
         # Check if product has any transactions or inventory records
-        from .transaction_service import TransactionService
+        has_transactions = (await self.session.exec(
+            select(Transaction.id).where(Transaction.product_id == product_id).limit(1)
+        )).first() is not None
 
-        transaction_service = TransactionService(self.session)
-        has_transactions = len(transaction_service.list_transactions(product_id=product_id)) > 0
-
-        inventory_items = self.session.exec(
+        inventory_items = (await self.session.exec(
             select(Inventory).where(Inventory.product_id == product_id)
-        ).all()
+        )).all()
 
         # Check if there are any non-zero inventory quantities
         has_meaningful_inventory = any(
@@ -162,18 +163,18 @@ class InventoryService:
 
         # Delete empty inventory records first (auto-created records with zero quantities)
         for item in inventory_items:
-            self.session.delete(item)
+            await self.session.delete(item)
 
         sku = product.sku
-        self.session.delete(product)
-        self.session.commit()
+        await self.session.delete(product)
+        await self.session.commit()
 
         logger.warning(f"Permanently deleted product: {sku}")
         return True
     
     # Inventory operations
     
-    def get_inventory(
+    async def get_inventory(
         self, 
         product_id: Optional[int] = None,
         location_id: Optional[int] = None
@@ -186,31 +187,40 @@ class InventoryService:
         if location_id:
             query = query.where(Inventory.location_id == location_id)
         
-        return list(self.session.exec(query))
+        return list(await self.session.exec(query))
+    
+    async def get_inventory_for_products(self, product_ids: List[int]) -> Dict[int, List[Inventory]]:
+        """Get inventory records of several products in one query, grouped by product ID."""
+        inventory_by_product = {product_id: [] for product_id in product_ids}
+        if product_ids:
+            query = select(Inventory).where(Inventory.product_id.in_(product_ids))
+            for inventory in await self.session.exec(query):
+                inventory_by_product[inventory.product_id].append(inventory)
+        return inventory_by_product
     
-    def get_inventory_by_product_location(
+    async def get_inventory_by_product_location(
         self, 
         product_id: int, 
         location_id: int
     ) -> Optional[Inventory]:
         """Get specific inventory record."""
-        return self.session.exec(
+        return (await self.session.exec(
             select(Inventory).where(
                 and_(
                     Inventory.product_id == product_id,
                     Inventory.location_id == location_id
                 )
             )
-        ).first()
+        )).first()
     
-    def update_inventory(
+    async def update_inventory(
         self, 
         product_id: int, 
         location_id: int, 
         inventory_data: InventoryUpdate
     ) -> Optional[Inventory]:
         """Update inventory quantities."""
-        inventory = self.get_inventory_by_product_location(product_id, location_id)
+        inventory = await self.get_inventory_by_product_location(product_id, location_id)
         
         if not inventory:
             # Create if doesn't exist
@@ -232,95 +242,114 @@ class InventoryService:
         
         inventory.last_updated = datetime.now(timezone.utc)
         self.session.add(inventory)
-        self.session.commit()
-        self.session.refresh(inventory)
+        await self.session.commit()
+        await self.session.refresh(inventory)
         
         logger.info(f"Updated inventory for product {product_id} at location {location_id}")
         return inventory
     
-    def get_available_quantity(self, product_id: int, location_id: int) -> int:
+    async def get_available_quantity(self, product_id: int, location_id: int) -> int:
         """Get available quantity (on_hand - reserved)."""
-        inventory = self.get_inventory_by_product_location(product_id, location_id)
+        inventory = await self.get_inventory_by_product_location(product_id, location_id)
         if not inventory:
             return 0
         return max(0, inventory.quantity_on_hand - inventory.reserved_quantity)
     
-    def get_total_available_quantity(self, product_id: int) -> int:
+    async def get_total_available_quantity(self, product_id: int) -> int:
         """Get total available quantity across all locations."""
-        inventories = self.get_inventory(product_id=product_id)
+        inventories = await self.get_inventory(product_id=product_id)
         total = 0
         for inv in inventories:
             total += max(0, inv.quantity_on_hand - inv.reserved_quantity)
         return total
     
-    def get_low_stock_products(self) -> List[Product]:
-        """Get products with stock below reorder point."""
+    async def get_low_stock_products(self, product_id: Optional[int] = None) -> List[Product]:
+        """Get products with stock below reorder point, optionally only the given product."""
         from sqlmodel import text
         
-        query = text("""
+        # Filter before grouping so a single-product check only sums its own rows
+        product_filter = "WHERE product_id = :product_id" if product_id is not None else ""
+        query = text(f"""
         SELECT p.* FROM products p
         JOIN (
             SELECT product_id, SUM(quantity_on_hand - reserved_quantity) as available
             FROM inventory
+            {product_filter}
             GROUP BY product_id
         ) i ON p.id = i.product_id
         WHERE i.available <= p.reorder_point AND p.is_active = 1
         """)
-        result = self.session.exec(query)
+        if product_id is not None:
+            query = query.bindparams(product_id=product_id)
+        result = await self.session.exec(query)
         return list(result)
     
-    def reserve_inventory(
+    async def reserve_inventory(
         self, 
         product_id: int, 
         location_id: int, 
         quantity: int
     ) -> bool:
         """Reserve inventory quantity."""
-        inventory = self.get_inventory_by_product_location(product_id, location_id)
-        if not inventory:
-            return False
-        
-        available = inventory.quantity_on_hand - inventory.reserved_quantity
-        if available < quantity:
+        # The availability check is part of the UPDATE itself, so concurrent
+        # reservations never lock the row for a read-then-write and cannot
+        # over-reserve; no row updated means missing record or too little stock
+        statement = (
+            update(Inventory)
+            .where(Inventory.product_id == product_id)
+            .where(Inventory.location_id == location_id)
+            .where(Inventory.quantity_on_hand - Inventory.reserved_quantity >= quantity)
+            .values(
+                reserved_quantity=Inventory.reserved_quantity + quantity,
+                last_updated=datetime.now(timezone.utc)
+            )
+        )
+        if (await self.session.exec(statement)).rowcount == 0:
+            await self.session.rollback()
             return False
-        
-        inventory.reserved_quantity += quantity
-        inventory.last_updated = datetime.now(timezone.utc)
-        self.session.add(inventory)
-        self.session.commit()
+        await self.session.commit()
         
         logger.info(f"Reserved {quantity} units of product {product_id} at location {location_id}")
         return True
     
-    def release_reservation(
+    async def release_reservation(
         self, 
         product_id: int, 
         location_id: int, 
         quantity: int
     ) -> bool:
         """Release reserved inventory."""
-        inventory = self.get_inventory_by_product_location(product_id, location_id)
-        if not inventory:
+        # Decrement in the UPDATE, never below zero, instead of read-modify-write
+        statement = (
+            update(Inventory)
+            .where(Inventory.product_id == product_id)
+            .where(Inventory.location_id == location_id)
+            .values(
+                reserved_quantity=case(
+                    (Inventory.reserved_quantity > quantity, Inventory.reserved_quantity - quantity),
+                    else_=0
+                ),
+                last_updated=datetime.now(timezone.utc)
+            )
+        )
+        if (await self.session.exec(statement)).rowcount == 0:
+            await self.session.rollback()
             return False
-        
-        inventory.reserved_quantity = max(0, inventory.reserved_quantity - quantity)
-        inventory.last_updated = datetime.now(timezone.utc)
-        self.session.add(inventory)
-        self.session.commit()
+        await self.session.commit()
         
         logger.info(f"Released {quantity} reserved units of product {product_id} at location {location_id}")
         return True
     
     # Helper methods
     
-    def _create_initial_inventory_records(self, product_id: int) -> None:
+    async def _create_initial_inventory_records(self, product_id: int) -> None:
         """Create initial inventory records for all active locations."""
-        locations = self.session.exec(
+        locations = (await self.session.exec(
             select(Location).where(Location.is_active == True)
-        ).all()
+        )).all()
         
         for location in locations:
-            existing = self.get_inventory_by_product_location(product_id, location.id)
+            existing = await self.get_inventory_by_product_location(product_id, location.id)
             if not existing:
                 inventory = Inventory(
                     product_id=product_id,
@@ -330,12 +359,12 @@ class InventoryService:
                 )
                 self.session.add(inventory)
         
-        self.session.commit()
+        await self.session.commit()
         logger.info(f"Created initial inventory records for product {product_id}")
     
-    def get_product_categories(self) -> List[str]:
+    async def get_product_categories(self) -> List[str]:
         """Get list of distinct product categories."""
-        result = self.session.exec(
+        result = await self.session.exec(
             select(Product.category).distinct().where(Product.category.is_not(None))
         )
         return [cat for cat in result if cat]
\ No newline at end of file
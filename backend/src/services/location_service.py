@@ -3,9 +3,12 @@ Location service for warehouse/storage location management.
 """
 from datetime import datetime, timezone
 from typing import List, Optional
-from sqlmodel import Session, select, func
+from sqlmodel import select, func, or_
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import bindparam, lambda_stmt, update
 from decimal import Decimal
 
+from ..data.database import gather_queries
 from ..data.models import (
     Location, LocationCreate, LocationUpdate, LocationRead,
     Inventory, Product, Transaction
@@ -14,60 +17,68 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Cached statements for the hot lookups; lambda_stmt skips rebuilding the expression tree
+_location_by_name_stmt = lambda_stmt(lambda: select(Location).where(Location.name == bindparam("name")))
+_location_by_code_stmt = lambda_stmt(lambda: select(Location).where(Location.code == bindparam("code")))
+
+# Distinct non-empty warehouse types, shared by get_warehouse_types and statistics
+_warehouse_types_query = (
+    select(Location.warehouse_type)
+    .where(Location.warehouse_type.is_not(None))
+    .where(Location.warehouse_type != "")
+    .distinct()
+)
+
 
 class LocationService:
     """Service for location/warehouse management."""
     
-    def __init__(self, session: Session):
+    def __init__(self, session: AsyncSession):
         self.session = session
     
-    def create_location(self, location_data: LocationCreate) -> Location:
+    async def create_location(self, location_data: LocationCreate) -> Location:
         """Create a new location."""
         # Check if location name already exists
-        existing = self.session.exec(
-            select(Location).where(Location.name == location_data.name)
-        ).first()
+        existing = await self.get_location_by_name(location_data.name)
         
         if existing:
             raise ValueError(f"Location with name '{location_data.name}' already exists")
         
         # Check if code is provided and unique
         if location_data.code:
-            existing_code = self.session.exec(
-                select(Location).where(Location.code == location_data.code)
-            ).first()
+            existing_code = await self.get_location_by_code(location_data.code)
             if existing_code:
                 raise ValueError(f"Location with code '{location_data.code}' already exists")
         
         # Create location
         location = Location.model_validate(location_data.model_dump())
-        location.created_at = datetime.now(timezone.utc)
-        location.updated_at = datetime.now(timezone.utc)
+        now = datetime.now(timezone.utc)
+        location.created_at = location.updated_at = now
         
         self.session.add(location)
-        self.session.commit()
-        self.session.refresh(location)
+        await self.session.commit()
+        await self.session.refresh(location)
         
         logger.info(f"Created location: {location.name}")
         return location
     
-    def get_location(self, location_id: int) -> Optional[Location]:
+    async def get_location(self, location_id: int) -> Optional[Location]:
         """Get location by ID."""
-        return self.session.get(Location, location_id)
+        return await self.session.get(Location, location_id)
     
-    def get_location_by_name(self, name: str) -> Optional[Location]:
+    async def get_location_by_name(self, name: str) -> Optional[Location]:
         """Get location by name."""
-        return self.session.exec(
-            select(Location).where(Location.name == name)
-        ).first()
+        return (await self.session.exec(
+            _location_by_name_stmt, params={"name": name}
+        )).scalars().first()
     
-    def get_location_by_code(self, code: str) -> Optional[Location]:
+    async def get_location_by_code(self, code: str) -> Optional[Location]:
         """Get location by code."""
-        return self.session.exec(
-            select(Location).where(Location.code == code)
-        ).first()
+        return (await self.session.exec(
+            _location_by_code_stmt, params={"code": code}
+        )).scalars().first()
     
-    def list_locations(
+    async def list_locations(
         self,
         skip: int = 0,
         limit: int = 50,
@@ -75,63 +86,67 @@ class LocationService:
         warehouse_type: Optional[str] = None
     ) -> List[Location]:
         """List locations with optional filtering."""
-        query = select(Location)
+        # Closure variables become bound parameters of the cached lambda statement
+        query = lambda_stmt(lambda: select(Location))
         
         if is_active is not None:
-            query = query.where(Location.is_active == is_active)
+            query += lambda q: q.where(Location.is_active == is_active)
         if warehouse_type:
-            query = query.where(Location.warehouse_type == warehouse_type)
+            query += lambda q: q.where(Location.warehouse_type == warehouse_type)
         
-        query = query.offset(skip).limit(limit)
-        return list(self.session.exec(query))
+        query += lambda q: q.offset(skip).limit(limit)
+        return list((await self.session.exec(query)).scalars())
     
-    def update_location(self, location_id: int, location_data: LocationUpdate) -> Optional[Location]:
+    async def update_location(self, location_id: int, location_data: LocationUpdate) -> Optional[Location]:
         """Update location."""
-        location = self.session.get(Location, location_id)
-        if not location:
+        # A missing location is reported as such, even when the new name or code is taken
+        if await self.session.get(Location, location_id) is None:
             return None
         
-        # Check for name conflicts if name is being updated
-        if location_data.name and location_data.name != location.name:
-            existing = self.session.exec(
-                select(Location).where(Location.name == location_data.name)
-            ).first()
-            if existing:
-                raise ValueError(f"Location with name '{location_data.name}' already exists")
-        
-        # Check for code conflicts if code is being updated
-        if location_data.code and location_data.code != location.code:
-            existing_code = self.session.exec(
-                select(Location).where(Location.code == location_data.code)
-            ).first()
-            if existing_code:
+        # Check for name/code conflicts with other locations in a single query
+        conflicts = []
+        if location_data.name:
+            conflicts.append(Location.name == location_data.name)
+        if location_data.code:
+            conflicts.append(Location.code == location_data.code)
+        if conflicts:
+            existing = (await self.session.exec(
+                select(Location.name)
+                .where(Location.id != location_id)
+                .where(or_(*conflicts))
+                .limit(1)
+            )).first()
+            if existing is not None:
+                if location_data.name and existing == location_data.name:
+                    raise ValueError(f"Location with name '{location_data.name}' already exists")
                 raise ValueError(f"Location with code '{location_data.code}' already exists")
         
-        # Update fields
+        # Update fields in a single UPDATE ... RETURNING statement
         update_data = location_data.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(location, field, value)
-        
-        location.updated_at = datetime.now(timezone.utc)
-        self.session.add(location)
-        self.session.commit()
-        self.session.refresh(location)
+        update_data["updated_at"] = datetime.now(timezone.utc)
+        location = (await self.session.exec(
+            update(Location)
+            .where(Location.id == location_id)
+            .values(**update_data)
+            .returning(Location)
+        )).scalar_one()
+        await self.session.commit()
         
         logger.info(f"Updated location: {location.name}")
         return location
     
-    def delete_location(self, location_id: int) -> bool:
+    async def delete_location(self, location_id: int) -> bool:
         """Soft delete location (deactivate)."""
-        location = self.session.get(Location, location_id)
+        location = await self.session.get(Location, location_id)
         if not location:
             return False
         
         # Check if location has inventory
-        inventory_count = self.session.exec(
+        inventory_count = (await self.session.exec(
             select(func.count(Inventory.id))
             .where(Inventory.location_id == location_id)
             .where(Inventory.quantity_on_hand > 0)
-        ).first()
+        )).first()
         
         if inventory_count > 0:
             raise ValueError(
@@ -142,41 +157,37 @@ class LocationService:
         location.is_active = False
         location.updated_at = datetime.now(timezone.utc)
         self.session.add(location)
-        self.session.commit()
+        await self.session.commit()
         
         logger.info(f"Deactivated location: {location.name}")
         return True
 
-    def delete_location_permanently(self, location_id: int) -> bool:
+    async def delete_location_permanently(self, location_id: int) -> bool:
         """Hard delete location (permanently remove from database)."""
-        location = self.session.get(Location, location_id)
+        location = await self.session.get(Location, location_id)
         if not location:
             return False
 
-        # Check if location has any inventory records (including zero quantities)
-        inventory_count = self.session.exec(
-            select(func.count(Inventory.id)).where(Inventory.location_id == location_id)
-        ).first()
-
-        if inventory_count > 0:
-            # Check if any have non-zero quantities
-            nonzero_inventory_count = self.session.exec(
-                select(func.count(Inventory.id))
-                .where(Inventory.location_id == location_id)
-                .where(Inventory.quantity_on_hand > 0)
-            ).first()
+        # Count all inventory records (including zero quantities) and those with stock
+        inventory_count, nonzero_inventory_count = (await self.session.exec(
+            select(
+                func.count(Inventory.id),
+                func.count(Inventory.id).filter(Inventory.quantity_on_hand > 0)
+            )
+            .where(Inventory.location_id == location_id)
+        )).one()
 
-            if nonzero_inventory_count > 0:
-                raise ValueError(
-                    f"Cannot permanently delete location {location.name}. "
-                    f"It has {nonzero_inventory_count} inventory records with stock. "
-                    "Move or adjust inventory first to preserve data integrity."
-                )
+        if nonzero_inventory_count > 0:
+            raise ValueError(
+                f"Cannot permanently delete location {location.name}. "
+                f"It has {nonzero_inventory_count} inventory records with stock. "
+                "Move or adjust inventory first to preserve data integrity."
+            )
 
         # Check if location has any transactions
-        transaction_count = self.session.exec(
+        transaction_count = (await self.session.exec(
             select(func.count(Transaction.id)).where(Transaction.location_id == location_id)
-        ).first()
+        )).first()
 
         if transaction_count > 0:
             raise ValueError(
@@ -187,54 +198,49 @@ class LocationService:
 
         # If there are only empty inventory records (auto-created), delete them first
         if inventory_count > 0:
-            self.session.exec(
-                select(Inventory).where(Inventory.location_id == location_id)
-            ).all()
-            for inv in self.session.exec(
+            for inv in (await self.session.exec(
                 select(Inventory).where(Inventory.location_id == location_id)
-            ).all():
-                self.session.delete(inv)
+            )).all():
+                await self.session.delete(inv)
 
         name = location.name
-        self.session.delete(location)
-        self.session.commit()
+        await self.session.delete(location)
+        await self.session.commit()
 
         logger.warning(f"Permanently deleted location: {name}")
         return True
     
-    def get_location_inventory(self, location_id: int) -> List[Inventory]:
+    async def get_location_inventory(self, location_id: int) -> List[Inventory]:
         """Get all inventory records for a location."""
-        return list(self.session.exec(
+        return list(await self.session.exec(
             select(Inventory)
             .where(Inventory.location_id == location_id)
             .where(Inventory.quantity_on_hand > 0)
         ))
     
-    def get_location_inventory_summary(self, location_id: int) -> dict:
+    async def get_location_inventory_summary(self, location_id: int) -> dict:
         """Get inventory summary for a location."""
-        location = self.get_location(location_id)
+        location = await self.get_location(location_id)
         if not location:
             raise ValueError(f"Location with ID {location_id} not found")
         
-        inventory_records = self.get_location_inventory(location_id)
+        total_products = total_quantity = total_reserved = total_available = 0
+        total_value = 0
         
-        total_products = len(inventory_records)
-        total_quantity = sum(inv.quantity_on_hand for inv in inventory_records)
-        total_reserved = sum(inv.reserved_quantity for inv in inventory_records)
-        total_available = sum(max(0, inv.quantity_on_hand - inv.reserved_quantity) for inv in inventory_records)
-        
-        # Calculate total value (need to join with products for unit cost)
-        inventory_with_products = list(self.session.exec(
+        # Stream inventory joined with products (for unit cost) in a single pass
+        result = await self.session.stream(
             select(Inventory, Product)
+            .join(Product, Inventory.product_id == Product.id)
             .where(Inventory.location_id == location_id)
             .where(Inventory.quantity_on_hand > 0)
-            .where(Inventory.product_id == Product.id)
-        ))
-        
-        total_value = sum(
-            inv.quantity_on_hand * product.unit_cost 
-            for inv, product in inventory_with_products
+            .execution_options(yield_per=1000)
         )
+        async for inv, product in result:
+            total_products += 1
+            total_quantity += inv.quantity_on_hand
+            total_reserved += inv.reserved_quantity
+            total_available += max(0, inv.quantity_on_hand - inv.reserved_quantity)
+            total_value += inv.quantity_on_hand * product.unit_cost
         
         return {
             "location_id": location_id,
@@ -248,44 +254,49 @@ class LocationService:
             "is_active": location.is_active
         }
     
-    def get_location_activity(self, location_id: int, days: int = 30) -> dict:
+    async def get_location_activity(self, location_id: int, days: int = 30) -> dict:
         """Get recent activity summary for a location."""
         from datetime import timedelta
         
-        location = self.get_location(location_id)
+        location = await self.get_location(location_id)
         if not location:
             raise ValueError(f"Location with ID {location_id} not found")
         
-        # Get transactions from the last N days
+        # Stream transactions from the last N days, newest first
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
-        recent_transactions = list(self.session.exec(
+        result = await self.session.stream_scalars(
             select(Transaction)
             .where(Transaction.location_id == location_id)
             .where(Transaction.created_at >= cutoff_date)
-        ))
-        
-        # Categorize transactions
-        in_transactions = [t for t in recent_transactions if t.quantity > 0]
-        out_transactions = [t for t in recent_transactions if t.quantity < 0]
-        
-        total_in = sum(t.quantity for t in in_transactions)
-        total_out = abs(sum(t.quantity for t in out_transactions))
+            .order_by(Transaction.created_at.desc())
+            .execution_options(yield_per=1000)
+        )
         
-        # Prepare transaction type summary
+        total_transactions = in_count = out_count = total_in = total_out = 0
         transaction_types = {}
-        for txn in recent_transactions:
+        recent_transactions = []
+        async for txn in result:
+            total_transactions += 1
+            if txn.quantity > 0:
+                in_count += 1
+                total_in += txn.quantity
+            elif txn.quantity < 0:
+                out_count += 1
+                total_out -= txn.quantity
+            
             txn_type = txn.transaction_type.value
-            if txn_type not in transaction_types:
-                transaction_types[txn_type] = 0
-            transaction_types[txn_type] += 1
+            transaction_types[txn_type] = transaction_types.get(txn_type, 0) + 1
+            
+            if len(recent_transactions) < 10:
+                recent_transactions.append(txn)
         
         return {
             "location_id": location_id,
             "location_name": location.name,
             "period_days": days,
-            "total_transactions": len(recent_transactions),
-            "in_transactions": len(in_transactions),
-            "out_transactions": len(out_transactions),
+            "total_transactions": total_transactions,
+            "in_transactions": in_count,
+            "out_transactions": out_count,
             "total_quantity_in": total_in,
             "total_quantity_out": total_out,
             "net_change": total_in - total_out,
@@ -299,34 +310,31 @@ class LocationService:
                     "reference_number": t.reference_number,
                     "user_id": t.user_id
                 }
-                for t in sorted(recent_transactions, key=lambda x: x.created_at, reverse=True)[:10]
+                for t in recent_transactions
             ],
             "transaction_types": transaction_types
         }
     
-    def get_location_statistics(self) -> dict:
+    async def get_location_statistics(self) -> dict:
         """Get overall location statistics."""
-        total_locations = self.session.exec(select(func.count(Location.id))).first()
-        active_locations = self.session.exec(
-            select(func.count(Location.id)).where(Location.is_active == True)
-        ).first()
-        
-        # Get warehouse types
-        warehouse_types = list(self.session.exec(
-            select(Location.warehouse_type)
-            .where(Location.warehouse_type.is_not(None))
-            .distinct()
-        ))
-        
-        # Get locations with most inventory
-        locations_with_inventory = list(self.session.exec(
-            select(Location.id, Location.name, func.sum(Inventory.quantity_on_hand).label("total_qty"))
+        # Independent queries run concurrently where the session is bound to an engine
+        total_qty = func.sum(Inventory.quantity_on_hand).label("total_qty")
+        totals, warehouse_types, locations_with_inventory = await gather_queries(
+            self.session,
+            select(
+                func.count(Location.id),
+                func.count(Location.id).filter(Location.is_active == True)
+            ),
+            _warehouse_types_query,
+            # Locations with most inventory
+            select(Location.id, Location.name, Location.code, Location.warehouse_type, total_qty)
             .join(Inventory, Location.id == Inventory.location_id)
             .where(Location.is_active == True)
-            .group_by(Location.id, Location.name)
-            .order_by(func.sum(Inventory.quantity_on_hand).desc())
+            .group_by(Location.id)
+            .order_by(total_qty.desc())
             .limit(5)
-        ))
+        )
+        total_locations, active_locations = totals[0]
         
         return {
             "total_locations": total_locations or 0,
@@ -335,17 +343,19 @@ class LocationService:
             "warehouse_types": warehouse_types,
             "top_locations_by_inventory": [
                 {
-                    "id": row[0],
-                    "name": row[1], 
-                    "total_quantity": row[2]
+                    "id": location_id,
+                    "name": name,
+                    "code": code,
+                    "warehouse_type": warehouse_type,
+                    "total_quantity": total_quantity
                 }
-                for row in locations_with_inventory
+                for location_id, name, code, warehouse_type, total_quantity in locations_with_inventory
             ]
         }
     
-    def get_empty_locations(self) -> List[Location]:
+    async def get_empty_locations(self) -> List[Location]:
         """Get locations with no inventory."""
-        return list(self.session.exec(
+        return list(await self.session.exec(
             select(Location)
             .where(Location.is_active == True)
             .where(~Location.id.in_(
@@ -355,14 +365,14 @@ class LocationService:
             ))
         ))
     
-    def get_locations_with_low_activity(self, days: int = 30, min_transactions: int = 5) -> List[Location]:
+    async def get_locations_with_low_activity(self, days: int = 30, min_transactions: int = 5) -> List[Location]:
         """Get locations with low transaction activity."""
         from datetime import timedelta
         
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
         
         # Get locations with transaction counts
-        locations_with_counts = list(self.session.exec(
+        locations_with_counts = list(await self.session.exec(
             select(Location.id, Location.name, func.count(Transaction.id).label("transaction_count"))
             .outerjoin(Transaction, Location.id == Transaction.location_id)
             .where(Location.is_active == True)
@@ -373,15 +383,10 @@ class LocationService:
         
         # Convert to Location objects
         low_activity_location_ids = [row[0] for row in locations_with_counts]
-        return list(self.session.exec(
+        return list(await self.session.exec(
             select(Location).where(Location.id.in_(low_activity_location_ids))
         ))
     
-    def get_warehouse_types(self) -> List[str]:
+    async def get_warehouse_types(self) -> List[str]:
         """Get list of distinct warehouse types."""
-        result = self.session.exec(
-            select(Location.warehouse_type)
-            .distinct()
-            .where(Location.warehouse_type.is_not(None))
-        )
-        return [wt for wt in result if wt]
\ No newline at end of file
+        return list(await self.session.exec(_warehouse_types_query))
\ No newline at end of file
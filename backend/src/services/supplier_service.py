@@ -2,10 +2,13 @@
 Supplier service for vendor management operations.
 """
 from datetime import datetime, timezone
-from typing import List, Optional
-from sqlmodel import Session, select, func
+from typing import List, Optional, Union
+from sqlmodel import select, func, and_
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import bindparam, case, distinct, lambda_stmt, update
 from decimal import Decimal
 
+from ..data.database import gather_queries
 from ..data.models import (
     Supplier, SupplierCreate, SupplierUpdate, SupplierRead,
     Product, Transaction, TransactionType
@@ -14,102 +17,120 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Cached statement for the hot name lookup; lambda_stmt skips rebuilding the expression tree
+_supplier_by_name_stmt = lambda_stmt(lambda: select(Supplier).where(Supplier.name == bindparam("name")))
+
 
 class SupplierService:
     """Service for supplier/vendor management."""
     
-    def __init__(self, session: Session):
+    def __init__(self, session: AsyncSession):
         self.session = session
     
-    def create_supplier(self, supplier_data: SupplierCreate) -> Supplier:
+    async def create_supplier(self, supplier_data: SupplierCreate) -> Supplier:
         """Create a new supplier."""
         # Check if supplier name already exists
-        existing = self.session.exec(
-            select(Supplier).where(Supplier.name == supplier_data.name)
-        ).first()
+        existing = await self.get_supplier_by_name(supplier_data.name)
         
         if existing:
             raise ValueError(f"Supplier with name '{supplier_data.name}' already exists")
         
         # Create supplier
         supplier = Supplier.model_validate(supplier_data.model_dump())
-        supplier.created_at = datetime.now(timezone.utc)
-        supplier.updated_at = datetime.now(timezone.utc)
+        now = datetime.now(timezone.utc)
+        supplier.created_at = supplier.updated_at = now
         
         self.session.add(supplier)
-        self.session.commit()
-        self.session.refresh(supplier)
+        await self.session.commit()
+        await self.session.refresh(supplier)
         
         logger.info(f"Created supplier: {supplier.name}")
         return supplier
     
-    def get_supplier(self, supplier_id: int) -> Optional[Supplier]:
+    async def get_supplier(self, supplier_id: int) -> Optional[Supplier]:
         """Get supplier by ID."""
-        return self.session.get(Supplier, supplier_id)
+        return await self.session.get(Supplier, supplier_id)
     
-    def get_supplier_by_name(self, name: str) -> Optional[Supplier]:
+    async def get_supplier_by_name(self, name: str) -> Optional[Supplier]:
         """Get supplier by name."""
-        return self.session.exec(
-            select(Supplier).where(Supplier.name == name)
-        ).first()
+        return (await self.session.exec(
+            _supplier_by_name_stmt, params={"name": name}
+        )).scalars().first()
     
-    def list_suppliers(
+    async def list_suppliers(
         self,
         skip: int = 0,
         limit: int = 50,
         is_active: Optional[bool] = None,
-        min_rating: Optional[float] = None
-    ) -> List[Supplier]:
-        """List suppliers with optional filtering."""
-        query = select(Supplier)
+        min_rating: Optional[float] = None,
+        fields: Optional[List[str]] = None
+    ) -> Union[List[Supplier], List[dict]]:
+        """List suppliers with optional filtering.
+        
+        With ``fields``, only those columns are selected and plain dicts are returned.
+        """
+        # Closure variables become bound parameters of the cached lambda statement
+        query = lambda_stmt(lambda: select(Supplier))
         
+        if fields:
+            unknown = set(fields).difference(SupplierRead.model_fields)
+            if unknown:
+                raise ValueError(f"Invalid supplier field(s): {', '.join(sorted(unknown))}")
+            # The selected columns change the statement's shape, so they are tracked
+            # as part of its cache key rather than as bound values
+            columns = tuple(Supplier.__table__.c[field] for field in fields)
+            query = query.add_criteria(lambda q: q.with_only_columns(*columns), track_on=[columns])
         if is_active is not None:
-            query = query.where(Supplier.is_active == is_active)
+            query += lambda q: q.where(Supplier.is_active == is_active)
         if min_rating is not None:
-            query = query.where(Supplier.performance_rating >= min_rating)
+            query += lambda q: q.where(Supplier.performance_rating >= min_rating)
         
-        query = query.offset(skip).limit(limit)
-        return list(self.session.exec(query))
+        query += lambda q: q.offset(skip).limit(limit)
+        result = await self.session.exec(query)
+        if fields:
+            return [dict(row) for row in result.mappings()]
+        return list(result.scalars())
     
-    def update_supplier(self, supplier_id: int, supplier_data: SupplierUpdate) -> Optional[Supplier]:
+    async def update_supplier(self, supplier_id: int, supplier_data: SupplierUpdate) -> Optional[Supplier]:
         """Update supplier."""
-        supplier = self.session.get(Supplier, supplier_id)
-        if not supplier:
-            return None
-        
-        # Check for name conflicts if name is being updated
-        if supplier_data.name and supplier_data.name != supplier.name:
-            existing = self.session.exec(
-                select(Supplier).where(Supplier.name == supplier_data.name)
-            ).first()
+        # Check for name conflicts with other suppliers if name is being updated
+        if supplier_data.name:
+            existing = (await self.session.exec(
+                select(Supplier.id)
+                .where(Supplier.name == supplier_data.name)
+                .where(Supplier.id != supplier_id)
+            )).first()
             if existing:
                 raise ValueError(f"Supplier with name '{supplier_data.name}' already exists")
         
-        # Update fields
+        # Update fields in a single UPDATE ... RETURNING statement
         update_data = supplier_data.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(supplier, field, value)
-        
-        supplier.updated_at = datetime.now(timezone.utc)
-        self.session.add(supplier)
-        self.session.commit()
-        self.session.refresh(supplier)
+        update_data["updated_at"] = datetime.now(timezone.utc)
+        supplier = (await self.session.exec(
+            update(Supplier)
+            .where(Supplier.id == supplier_id)
+            .values(**update_data)
+            .returning(Supplier)
+        )).scalar_one_or_none()
+        if not supplier:
+            return None
+        await self.session.commit()
         
         logger.info(f"Updated supplier: {supplier.name}")
         return supplier
     
-    def delete_supplier(self, supplier_id: int) -> bool:
-        """Soft delete supplier (deactivate)."""
-        supplier = self.session.get(Supplier, supplier_id)
+    async def delete_supplier(self, supplier_id: int) -> Optional[Supplier]:
+        """Soft delete supplier (deactivate); returns the deactivated supplier, or None if not found."""
+        supplier = await self.session.get(Supplier, supplier_id)
         if not supplier:
-            return False
+            return None
         
         # Check if supplier has active products
-        active_products_count = self.session.exec(
+        active_products_count = (await self.session.exec(
             select(func.count(Product.id))
             .where(Product.supplier_id == supplier_id)
             .where(Product.is_active == True)
-        ).first()
+        )).first()
         
         if active_products_count > 0:
             raise ValueError(
@@ -120,21 +141,23 @@ class SupplierService:
         supplier.is_active = False
         supplier.updated_at = datetime.now(timezone.utc)
         self.session.add(supplier)
-        self.session.commit()
+        await self.session.commit()
+        # Reload the stored values, so the returned row matches what reads return
+        await self.session.refresh(supplier)
         
         logger.info(f"Deactivated supplier: {supplier.name}")
-        return True
+        return supplier
 
-    def delete_supplier_permanently(self, supplier_id: int) -> bool:
+    async def delete_supplier_permanently(self, supplier_id: int) -> bool:
         """Hard delete supplier (permanently remove from database)."""
-        supplier = self.session.get(Supplier, supplier_id)
+        supplier = await self.session.get(Supplier, supplier_id)
         if not supplier:
             return False
 
         # Check if supplier has any products
-        products_count = self.session.exec(
+        products_count = (await self.session.exec(
             select(func.count(Product.id)).where(Product.supplier_id == supplier_id)
-        ).first()
+        )).first()
 
         if products_count > 0:
             raise ValueError(
@@ -145,57 +168,70 @@ class SupplierService:
 
         # Check if supplier has any transactions through their products
         # This is additional safety even though we check products above
-        from .transaction_service import TransactionService
-        transaction_service = TransactionService(self.session)
-
-        # Get all products that were ever associated with this supplier
-        all_supplier_products = self.session.exec(
-            select(Product.id).where(Product.supplier_id == supplier_id)
-        ).all()
+        transaction_count = (await self.session.exec(
+            select(func.count(Transaction.id))
+            .join(Product, Transaction.product_id == Product.id)
+            .where(Product.supplier_id == supplier_id)
+        )).first()
 
-        if all_supplier_products:
-            # Check for any transactions involving these products
-            for product_id in all_supplier_products:
-                transactions = transaction_service.list_transactions(product_id=product_id)
-                if transactions:
-                    raise ValueError(
-                        f"Cannot permanently delete supplier {supplier.name}. "
-                        "It has products with existing transaction history. "
-                        "Use deactivate instead to preserve data integrity."
-                    )
+        if transaction_count > 0:
+            raise ValueError(
+                f"Cannot permanently delete supplier {supplier.name}. "
+                "It has products with existing transaction history. "
+                "Use deactivate instead to preserve data integrity."
+            )
 
         name = supplier.name
-        self.session.delete(supplier)
-        self.session.commit()
+        await self.session.delete(supplier)
+        await self.session.commit()
 
         logger.warning(f"Permanently deleted supplier: {name}")
         return True
     
-    def get_supplier_products(self, supplier_id: int) -> List[Product]:
+    async def get_supplier_products(self, supplier_id: int) -> List[Product]:
         """Get all products from a supplier."""
-        return list(self.session.exec(
+        return list(await self.session.exec(
             select(Product).where(Product.supplier_id == supplier_id)
         ))
     
-    def get_supplier_active_products(self, supplier_id: int) -> List[Product]:
+    async def get_supplier_active_products(self, supplier_id: int) -> List[Product]:
         """Get active products from a supplier."""
-        return list(self.session.exec(
+        return list(await self.session.exec(
             select(Product)
             .where(Product.supplier_id == supplier_id)
             .where(Product.is_active == True)
         ))
     
-    def calculate_supplier_performance(self, supplier_id: int) -> dict:
+    async def calculate_supplier_performance(self, supplier_id: int) -> dict:
         """Calculate supplier performance metrics."""
-        supplier = self.get_supplier(supplier_id)
+        supplier = await self.get_supplier(supplier_id)
         if not supplier:
             raise ValueError(f"Supplier with ID {supplier_id} not found")
         
-        # Get supplier products
-        products = self.get_supplier_products(supplier_id)
-        product_ids = [p.id for p in products]
+        # Product counts and receipt totals in a single aggregate query
+        metrics = (await self.session.exec(
+            select(
+                func.count(distinct(Product.id)),
+                func.count(distinct(case((Product.is_active == True, Product.id)))),
+                func.count(Transaction.id),
+                func.coalesce(
+                    func.sum(case((Transaction.quantity > 0, Transaction.quantity), else_=0)), 0
+                )
+            )
+            .select_from(Product)
+            .join(
+                Transaction,
+                and_(
+                    Transaction.product_id == Product.id,
+                    Transaction.transaction_type == TransactionType.IN
+                ),
+                isouter=True
+            )
+            .where(Product.supplier_id == supplier_id)
+        )).one()
+        total_products, active_products_count, total_receipts, total_quantity_received = metrics
         
-        if not product_ids:
+        if not total_products:
             return {
                 "supplier_id": supplier_id,
                 "supplier_name": supplier.name,
@@ -207,18 +243,6 @@ class SupplierService:
                 "performance_score": 0.0
             }
         
-        # Get receipt transactions for supplier products
-        receipt_transactions = list(self.session.exec(
-            select(Transaction)
-            .where(Transaction.product_id.in_(product_ids))
-            .where(Transaction.transaction_type == TransactionType.IN)
-        ))
-        
-        # Calculate metrics
-        total_receipts = len(receipt_transactions)
-        total_quantity_received = sum(t.quantity for t in receipt_transactions if t.quantity > 0)
-        active_products_count = len([p for p in products if p.is_active])
-        
         # Simple performance score based on activity and lead time
         performance_score = 0.0
         if total_receipts > 0:
@@ -230,7 +254,7 @@ class SupplierService:
         return {
             "supplier_id": supplier_id,
             "supplier_name": supplier.name,
-            "total_products": len(products),
+            "total_products": total_products,
             "active_products": active_products_count,
             "total_receipts": total_receipts,
             "total_quantity_received": total_quantity_received,
@@ -238,51 +262,51 @@ class SupplierService:
             "performance_score": round(performance_score, 2)
         }
     
-    def update_supplier_performance_rating(self, supplier_id: int) -> Optional[Supplier]:
+    async def update_supplier_performance_rating(
+        self,
+        supplier_id: int,
+        now: Optional[datetime] = None
+    ) -> Optional[Supplier]:
         """Update supplier's performance rating based on calculated metrics."""
-        performance = self.calculate_supplier_performance(supplier_id)
-        
-        supplier = self.get_supplier(supplier_id)
+        supplier = await self.get_supplier(supplier_id)
         if not supplier:
             return None
         
-        supplier.performance_rating = performance["performance_score"]
-        supplier.updated_at = datetime.now(timezone.utc)
-        
-        self.session.add(supplier)
-        self.session.commit()
-        self.session.refresh(supplier)
+        await self._apply_performance_rating(supplier, now or datetime.now(timezone.utc))
+        await self.session.commit()
+        await self.session.refresh(supplier)
         
         logger.info(f"Updated performance rating for supplier {supplier.name}: {supplier.performance_rating}")
         return supplier
     
-    def get_supplier_statistics(self) -> dict:
-        """Get overall supplier statistics."""
-        total_suppliers = self.session.exec(select(func.count(Supplier.id))).first()
-        active_suppliers = self.session.exec(
-            select(func.count(Supplier.id)).where(Supplier.is_active == True)
-        ).first()
-        
-        # Average lead time
-        avg_lead_time = self.session.exec(
-            select(func.avg(Supplier.lead_time_days)).where(Supplier.is_active == True)
-        ).first()
+    async def _apply_performance_rating(self, supplier: Supplier, now: datetime) -> None:
+        """Set a supplier's performance rating from calculated metrics without committing."""
+        performance = await self.calculate_supplier_performance(supplier.id)
         
-        # Average performance rating 
-        avg_performance = self.session.exec(
-            select(func.avg(Supplier.performance_rating))
-            .where(Supplier.is_active == True)
-            .where(Supplier.performance_rating.is_not(None))
-        ).first()
-        
-        # Top performing suppliers
-        top_suppliers = list(self.session.exec(
-            select(Supplier)
+        supplier.performance_rating = performance["performance_score"]
+        supplier.updated_at = now
+        self.session.add(supplier)
+    
+    async def get_supplier_statistics(self) -> dict:
+        """Get overall supplier statistics."""
+        # Independent queries run concurrently where the session is bound to an engine
+        totals, top_suppliers = await gather_queries(
+            self.session,
+            # Counts and averages in one scan; AVG already skips NULL ratings
+            select(
+                func.count(Supplier.id),
+                func.count(Supplier.id).filter(Supplier.is_active == True),
+                func.avg(Supplier.lead_time_days).filter(Supplier.is_active == True),
+                func.avg(Supplier.performance_rating).filter(Supplier.is_active == True)
+            ),
+            # Top performing suppliers; only the columns reported
+            select(Supplier.id, Supplier.name, Supplier.performance_rating, Supplier.lead_time_days)
             .where(Supplier.is_active == True)
             .where(Supplier.performance_rating.is_not(None))
             .order_by(Supplier.performance_rating.desc())
             .limit(5)
-        ))
+        )
+        total_suppliers, active_suppliers, avg_lead_time, avg_performance = totals[0]
         
         return {
             "total_suppliers": total_suppliers or 0,
@@ -292,39 +316,48 @@ class SupplierService:
             "average_performance_rating": round(avg_performance, 1) if avg_performance else 0,
             "top_suppliers": [
                 {
-                    "id": s.id,
-                    "name": s.name,
-                    "performance_rating": s.performance_rating,
-                    "lead_time_days": s.lead_time_days
+                    "id": supplier_id,
+                    "name": name,
+                    "performance_rating": performance_rating,
+                    "lead_time_days": lead_time_days
                 }
-                for s in top_suppliers
+                for supplier_id, name, performance_rating, lead_time_days in top_suppliers
             ]
         }
     
-    def get_suppliers_needing_review(self) -> List[Supplier]:
+    async def get_suppliers_needing_review(self, name_contains: Optional[str] = None) -> List[Supplier]:
         """Get suppliers that might need performance review."""
         # Suppliers with no performance rating or low rating
-        return list(self.session.exec(
+        query = (
             select(Supplier)
             .where(Supplier.is_active == True)
             .where(
                 (Supplier.performance_rating.is_(None)) |
                 (Supplier.performance_rating < 3.0)
             )
-        ))
+        )
+        if name_contains:
+            query = query.where(Supplier.name.contains(name_contains, autoescape=True))
+        
+        return list(await self.session.exec(query))
     
-    def bulk_update_performance_ratings(self) -> int:
+    async def bulk_update_performance_ratings(self) -> int:
         """Update performance ratings for all active suppliers."""
-        active_suppliers = self.list_suppliers(is_active=True)
+        active_suppliers = await self.list_suppliers(is_active=True)
         updated_count = 0
+        now = datetime.now(timezone.utc)
         
-        for supplier in active_suppliers:
-            try:
-                self.update_supplier_performance_rating(supplier.id)
-                updated_count += 1
-            except Exception as e:
-                logger.warning(f"Failed to update performance rating for supplier {supplier.id}: {e}")
-                continue
+        # Apply every rating in one transaction; pending updates are not flushed
+        # ahead of each metrics query and go out together on commit
+        with self.session.no_autoflush:
+            for supplier in active_suppliers:
+                try:
+                    await self._apply_performance_rating(supplier, now)
+                    updated_count += 1
+                except Exception as e:
+                    logger.warning(f"Failed to update performance rating for supplier {supplier.id}: {e}")
+                    continue
+        await self.session.commit()
         
         logger.info(f"Updated performance ratings for {updated_count} suppliers")
         return updated_count
\ No newline at end of file
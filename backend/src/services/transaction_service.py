@@ -2,12 +2,16 @@
 Transaction service for inventory movement processing.
 """
 from datetime import datetime, timezone
-from typing import List, Optional
-from sqlmodel import Session, select, and_, desc
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple, Union
+from sqlmodel import select, func, and_, desc
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import bindparam, case, insert, lambda_stmt, literal, tuple_, union_all, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import RowMapping
 from decimal import Decimal
 
 from ..data.models import (
-    Transaction, TransactionCreate, TransactionRead,
+    Transaction, TransactionCreate, TransactionRead, TransactionAggregate,
     TransactionType, Inventory, Product, Location
 )
 from .inventory_service import InventoryService
@@ -16,71 +20,176 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Columns returned by the row-based (non-ORM) history queries, matching TransactionRead
+_transaction_read_columns = (
+    Transaction.id, Transaction.product_id, Transaction.location_id,
+    Transaction.transaction_type, Transaction.quantity, Transaction.reference_number,
+    Transaction.notes, Transaction.user_id, Transaction.created_at
+)
+
 
 class TransactionService:
     """Service for transaction processing and inventory movements."""
     
-    def __init__(self, session: Session):
+    def __init__(self, session: AsyncSession):
         self.session = session
         self.inventory_service = InventoryService(session)
+        # Inventory rows already looked up by this service, keyed by (product_id, location_id)
+        self._inventory_cache: Dict[Tuple[int, int], Inventory] = {}
     
-    def create_transaction(self, transaction_data: TransactionCreate) -> Transaction:
-        """Create and process a new transaction."""
-        # Validate product and location exist
-        product = self.session.get(Product, transaction_data.product_id)
-        if not product:
-            raise ValueError(f"Product with ID {transaction_data.product_id} not found")
+    async def create_transaction(
+        self,
+        transaction_data: TransactionCreate,
+        autocommit: bool = True,
+        validate_refs: bool = True,
+        now: Optional[datetime] = None
+    ) -> Transaction:
+        """Create and process a new transaction.
         
-        location = self.session.get(Location, transaction_data.location_id)
-        if not location:
-            raise ValueError(f"Location with ID {transaction_data.location_id} not found")
+        With ``autocommit=False`` the caller owns the unit of work and must commit.
+        Callers that already checked the product and location pass ``validate_refs=False``.
+        Callers creating several transactions can pass one shared ``now`` timestamp.
+        """
+        if validate_refs:
+            await self._validate_references([transaction_data.product_id], [transaction_data.location_id])
         
         # Validate transaction based on type
-        self._validate_transaction(transaction_data)
+        await self._validate_transaction(transaction_data)
         
-        # Create transaction record
-        transaction = Transaction.model_validate(transaction_data.model_dump())
-        transaction.created_at = datetime.now(timezone.utc)
+        # Create transaction record (model_construct would skip ORM instrumentation)
+        now = now or datetime.now(timezone.utc)
+        transaction = Transaction(**transaction_data.model_dump(), created_at=now)
         
         self.session.add(transaction)
-        self.session.flush()  # Get the ID but don't commit yet
         
         # Update inventory based on transaction type
-        self._process_inventory_update(transaction)
+        await self._process_inventory_update(transaction, now)
+        await self._update_aggregates([transaction])
         
-        self.session.commit()
-        self.session.refresh(transaction)
+        if autocommit:
+            await self.session.commit()
+            await self.session.refresh(transaction)
         
+        # Lazy %-style args: nothing is formatted when INFO is filtered out
         logger.info(
-            f"Processed {transaction.transaction_type} transaction: "
-            f"Product {transaction.product_id}, Location {transaction.location_id}, "
-            f"Quantity {transaction.quantity}"
+            "Processed %s transaction: Product %s, Location %s, Quantity %s",
+            transaction.transaction_type, transaction.product_id,
+            transaction.location_id, transaction.quantity
         )
         
         return transaction
     
-    def create_bulk_transactions(self, transactions_data: List[TransactionCreate]) -> List[Transaction]:
+    async def create_bulk_transactions(
+        self,
+        transactions_data: List[TransactionCreate],
+        validate_refs: bool = True
+    ) -> List[Transaction]:
         """Create multiple transactions in a single batch."""
-        transactions = []
+        if not transactions_data:
+            return []
         
         try:
+            # Validate product and location references set-wise
+            if validate_refs:
+                await self._validate_references(
+                    [t.product_id for t in transactions_data],
+                    [t.location_id for t in transactions_data]
+                )
+            
+            # Load current inventory for every touched product/location pair at once
+            pairs = {(t.product_id, t.location_id) for t in transactions_data}
+            await self._prefetch_inventory(pairs)
+            on_hand = {
+                pair: self._inventory_cache[pair].quantity_on_hand
+                for pair in pairs if pair in self._inventory_cache
+            }
+            
+            # Validate each row in order against running inventory levels
+            now = datetime.now(timezone.utc)
+            rows = []
             for transaction_data in transactions_data:
-                transaction = self.create_transaction(transaction_data)
-                transactions.append(transaction)
+                pair = (transaction_data.product_id, transaction_data.location_id)
+                current = on_hand.get(pair, 0)
+                inventory = self._inventory_cache.get(pair)
+                reserved = inventory.reserved_quantity if inventory else 0
+                await self._validate_transaction(transaction_data, available=max(0, current - reserved))
+                
+                on_hand[pair] = self._apply_quantity_change(current, transaction_data.quantity)
+                rows.append({**transaction_data.model_dump(), "created_at": now})
+            
+            # Insert all transaction records, returned in input order. Databases that
+            # can order batched RETURNING rows (PostgreSQL) get multi-VALUES pages;
+            # SQLite falls back to one INSERT per row
+            transactions = list((await self.session.exec(
+                insert(Transaction).returning(Transaction, sort_by_parameter_order=True),
+                params=rows
+            )).scalars())
             
-            logger.info(f"Processed {len(transactions)} transactions in batch")
+            # Apply the net change per existing product/location pair as deltas in one
+            # executemany UPDATE (one UPDATE per row where the driver cannot count an
+            # executemany); new pairs get fresh inventory records
+            changes = []
+            for (product_id, location_id), quantity in on_hand.items():
+                inventory = self._inventory_cache.get((product_id, location_id))
+                if inventory:
+                    changes.append({
+                        "inventory_id": inventory.id,
+                        "delta": quantity - inventory.quantity_on_hand,
+                        "now": now
+                    })
+                    # Async sessions cannot lazy-load the expired columns, so the next
+                    # lookup re-selects the row instead of using the cached instance
+                    self.session.expire(inventory, ["quantity_on_hand", "last_updated"])
+                    del self._inventory_cache[(product_id, location_id)]
+                else:
+                    inventory = Inventory(
+                        product_id=product_id,
+                        location_id=location_id,
+                        quantity_on_hand=quantity,
+                        reserved_quantity=0,
+                        last_updated=now
+                    )
+                    self.session.add(inventory)
+                    self._inventory_cache[(product_id, location_id)] = inventory
+            
+            if changes:
+                inventory_table = Inventory.__table__
+                statement = (
+                    update(inventory_table)
+                    .where(inventory_table.c.id == bindparam("inventory_id"))
+                    .values(
+                        quantity_on_hand=inventory_table.c.quantity_on_hand + bindparam("delta"),
+                        last_updated=bindparam("now")
+                    )
+                )
+                if not settings.allow_negative_inventory:
+                    statement = statement.where(
+                        inventory_table.c.quantity_on_hand + bindparam("delta") >= 0
+                    )
+                if await self._count_updated_rows(statement, changes) != len(changes):
+                    raise ValueError(
+                        "Insufficient stock. Inventory changed while the batch was processed"
+                    )
+            
+            await self._update_aggregates(transactions)
+            
+            # The RETURNING rows stay loaded: async sessions do not expire on commit
+            await self.session.commit()
+            
+            logger.info("Processed %s transactions in batch", len(transactions))
             return transactions
             
         except Exception as e:
-            self.session.rollback()
-            logger.error(f"Batch transaction processing failed: {e}")
+            await self.session.rollback()
+            self._inventory_cache.clear()
+            logger.error("Batch transaction processing failed: %s", e)
             raise
     
-    def get_transaction(self, transaction_id: int) -> Optional[Transaction]:
+    async def get_transaction(self, transaction_id: int) -> Optional[Transaction]:
         """Get transaction by ID."""
-        return self.session.get(Transaction, transaction_id)
+        return await self.session.get(Transaction, transaction_id)
     
-    def list_transactions(
+    async def list_transactions(
         self,
         skip: int = 0,
         limit: int = 50,
@@ -89,56 +198,89 @@ class TransactionService:
         transaction_type: Optional[TransactionType] = None,
         reference_number: Optional[str] = None,
         start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None
-    ) -> List[Transaction]:
-        """List transactions with filtering options."""
-        query = select(Transaction)
+        end_date: Optional[datetime] = None,
+        after_id: Optional[int] = None
+    ) -> AsyncIterator[Transaction]:
+        """List transactions with filtering options.
+        
+        Pass the last ID of a page as ``after_id`` to get the next page by keyset
+        instead of skipping rows with an offset.
+        Rows are streamed in chunks of 1000; iterate the result once with ``async for``
+        while the session is open.
+        """
+        # Closure variables become bound parameters of the cached lambda statement
+        query = lambda_stmt(lambda: select(Transaction))
         
         # Apply filters
         if product_id:
-            query = query.where(Transaction.product_id == product_id)
+            query += lambda q: q.where(Transaction.product_id == product_id)
         if location_id:
-            query = query.where(Transaction.location_id == location_id)
+            query += lambda q: q.where(Transaction.location_id == location_id)
         if transaction_type:
-            query = query.where(Transaction.transaction_type == transaction_type)
+            query += lambda q: q.where(Transaction.transaction_type == transaction_type)
         if reference_number:
-            query = query.where(Transaction.reference_number == reference_number)
+            query += lambda q: q.where(Transaction.reference_number == reference_number)
         if start_date:
-            query = query.where(Transaction.created_at >= start_date)
+            query += lambda q: q.where(Transaction.created_at >= start_date)
         if end_date:
-            query = query.where(Transaction.created_at <= end_date)
+            query += lambda q: q.where(Transaction.created_at <= end_date)
+        if after_id:
+            # Rows that sort after the cursor row in the (created_at, id) listing order
+            query += lambda q: q.where(
+                tuple_(Transaction.created_at, Transaction.id) < tuple_(
+                    select(Transaction.created_at).where(Transaction.id == after_id).scalar_subquery(),
+                    after_id
+                )
+            )
         
-        # Order by most recent first
-        query = query.order_by(desc(Transaction.created_at))
-        query = query.offset(skip).limit(limit)
+        # Order by most recent first; the ID breaks ties so keyset pages are stable
+        query += lambda q: q.order_by(desc(Transaction.created_at), desc(Transaction.id)).offset(skip).limit(limit)
         
-        return list(self.session.exec(query))
+        return await self.session.stream_scalars(query, execution_options={"yield_per": 1000})
     
-    def get_product_transaction_history(
+    async def get_product_transaction_history(
         self, 
         product_id: int,
-        limit: int = 100
-    ) -> List[Transaction]:
-        """Get transaction history for a specific product."""
-        query = select(Transaction).where(
+        limit: int = 100,
+        scalar: bool = True
+    ) -> Union[List[Transaction], List[RowMapping]]:
+        """Get transaction history for a specific product.
+        
+        With ``scalar=False`` plain column rows are returned as mappings, skipping ORM hydration.
+        """
+        if scalar:
+            query = lambda_stmt(lambda: select(Transaction))
+        else:
+            query = lambda_stmt(lambda: select(*_transaction_read_columns))
+        query += lambda q: q.where(
             Transaction.product_id == product_id
         ).order_by(desc(Transaction.created_at)).limit(limit)
         
-        return list(self.session.exec(query))
+        result = await self.session.exec(query)
+        return list(result.scalars()) if scalar else list(result.mappings())
     
-    def get_location_transaction_history(
+    async def get_location_transaction_history(
         self, 
         location_id: int,
-        limit: int = 100
-    ) -> List[Transaction]:
-        """Get transaction history for a specific location."""
-        query = select(Transaction).where(
+        limit: int = 100,
+        scalar: bool = True
+    ) -> Union[List[Transaction], List[RowMapping]]:
+        """Get transaction history for a specific location.
+        
+        With ``scalar=False`` plain column rows are returned as mappings, skipping ORM hydration.
+        """
+        if scalar:
+            query = lambda_stmt(lambda: select(Transaction))
+        else:
+            query = lambda_stmt(lambda: select(*_transaction_read_columns))
+        query += lambda q: q.where(
             Transaction.location_id == location_id
         ).order_by(desc(Transaction.created_at)).limit(limit)
         
-        return list(self.session.exec(query))
+        result = await self.session.exec(query)
+        return list(result.scalars()) if scalar else list(result.mappings())
     
-    def process_stock_receipt(
+    async def process_stock_receipt(
         self,
         product_id: int,
         location_id: int,
@@ -157,9 +299,9 @@ class TransactionService:
             notes=notes,
             user_id=user_id
         )
-        return self.create_transaction(transaction_data)
+        return await self.create_transaction(transaction_data)
     
-    def process_stock_shipment(
+    async def process_stock_shipment(
         self,
         product_id: int,
         location_id: int,
@@ -178,9 +320,9 @@ class TransactionService:
             notes=notes,
             user_id=user_id
         )
-        return self.create_transaction(transaction_data)
+        return await self.create_transaction(transaction_data)
     
-    def process_stock_transfer(
+    async def process_stock_transfer(
         self,
         product_id: int,
         from_location_id: int,
@@ -190,17 +332,24 @@ class TransactionService:
         notes: Optional[str] = None,
         user_id: Optional[str] = None
     ) -> List[Transaction]:
-        """Process stock transfer between locations."""
+        """Process stock transfer between locations.
+        
+        Returns the OUT leg at the source followed by the IN leg at the destination.
+        """
         if from_location_id == to_location_id:
             raise ValueError("Source and destination locations cannot be the same")
         
+        await self._validate_references([product_id], [from_location_id, to_location_id])
+        
+        # Load source and destination inventory in one query; the availability check
+        # and the batch below both read these cached rows instead of querying again
+        await self._prefetch_inventory({(product_id, from_location_id), (product_id, to_location_id)})
+        
         # Check available quantity at source location
-        available = self.inventory_service.get_available_quantity(product_id, from_location_id)
+        available = await self._get_available_quantity(product_id, from_location_id)
         if available < quantity:
             raise ValueError(f"Insufficient stock. Available: {available}, Requested: {quantity}")
         
-        transactions = []
-        
         # OUT transaction from source
         out_transaction = TransactionCreate(
             product_id=product_id,
@@ -211,7 +360,6 @@ class TransactionService:
             notes=f"Transfer OUT to Location {to_location_id}" + (f": {notes}" if notes else ""),
             user_id=user_id
         )
-        transactions.append(self.create_transaction(out_transaction))
         
         # IN transaction to destination
         in_transaction = TransactionCreate(
@@ -223,12 +371,19 @@ class TransactionService:
             notes=f"Transfer IN from Location {from_location_id}" + (f": {notes}" if notes else ""),
             user_id=user_id
         )
-        transactions.append(self.create_transaction(in_transaction))
         
-        logger.info(f"Processed transfer of {quantity} units from location {from_location_id} to {to_location_id}")
+        # Insert both legs and apply both inventory changes in one batch and commit
+        transactions = await self.create_bulk_transactions(
+            [out_transaction, in_transaction], validate_refs=False
+        )
+        
+        logger.info(
+            "Processed transfer of %s units from location %s to %s",
+            quantity, from_location_id, to_location_id
+        )
         return transactions
     
-    def process_stock_adjustment(
+    async def process_stock_adjustment(
         self,
         product_id: int,
         location_id: int,
@@ -246,9 +401,9 @@ class TransactionService:
             notes=f"Stock adjustment: {reason}",
             user_id=user_id
         )
-        return self.create_transaction(transaction_data)
+        return await self.create_transaction(transaction_data)
     
-    def get_transaction_summary(
+    async def get_transaction_summary(
         self,
         product_id: Optional[int] = None,
         location_id: Optional[int] = None,
@@ -256,7 +411,49 @@ class TransactionService:
         end_date: Optional[datetime] = None
     ) -> dict:
         """Get transaction summary statistics."""
-        query = select(Transaction)
+        if start_date or end_date:
+            query = self._summary_from_transactions(product_id, location_id, start_date, end_date)
+        else:
+            # Without a date range the running totals answer it without touching history
+            query = self._summary_from_aggregates(product_id, location_id)
+        
+        counts = {transaction_type: 0 for transaction_type in TransactionType}
+        total_in = total_out = 0
+        for transaction_type, count, quantity_in, quantity_out in await self.session.exec(query):
+            counts[transaction_type] = count
+            total_in += quantity_in or 0
+            total_out += quantity_out or 0
+        
+        summary = {
+            "total_transactions": sum(counts.values()),
+            "in_transactions": counts[TransactionType.IN],
+            "out_transactions": counts[TransactionType.OUT],
+            "transfer_transactions": counts[TransactionType.TRANSFER],
+            "adjustment_transactions": counts[TransactionType.ADJUSTMENT],
+            "total_quantity_in": total_in,
+            "total_quantity_out": abs(total_out),
+        }
+        
+        return summary
+    
+    # Private helper methods
+    
+    def _summary_from_transactions(
+        self,
+        product_id: Optional[int],
+        location_id: Optional[int],
+        start_date: Optional[datetime],
+        end_date: Optional[datetime]
+    ):
+        """Build the per-type count and quantity query over the matching transactions."""
+        # Count and sum per transaction type in one grouped scan over plain columns;
+        # no Transaction instances are built
+        query = select(
+            Transaction.transaction_type,
+            func.count().label("transaction_count"),
+            func.sum(case((Transaction.quantity > 0, Transaction.quantity), else_=0)).label("quantity_in"),
+            func.sum(case((Transaction.quantity < 0, Transaction.quantity), else_=0)).label("quantity_out")
+        ).group_by(Transaction.transaction_type)
         
         if product_id:
             query = query.where(Transaction.product_id == product_id)
@@ -266,25 +463,97 @@ class TransactionService:
             query = query.where(Transaction.created_at >= start_date)
         if end_date:
             query = query.where(Transaction.created_at <= end_date)
+        return query
+    
+    def _summary_from_aggregates(self, product_id: Optional[int], location_id: Optional[int]):
+        """Build the per-type count and quantity query over the running totals."""
+        query = select(
+            TransactionAggregate.transaction_type,
+            func.sum(TransactionAggregate.transaction_count),
+            func.sum(TransactionAggregate.quantity_in),
+            func.sum(TransactionAggregate.quantity_out)
+        ).group_by(TransactionAggregate.transaction_type)
         
-        transactions = list(self.session.exec(query))
+        if product_id:
+            query = query.where(TransactionAggregate.product_id == product_id)
+        if location_id:
+            query = query.where(TransactionAggregate.location_id == location_id)
+        return query
+    
+    async def _update_aggregates(self, transactions: List[Transaction]) -> None:
+        """Add transactions to the running totals in one upsert per call."""
+        totals: Dict[Tuple[int, int, TransactionType], Dict[str, int]] = {}
+        for transaction in transactions:
+            key = (transaction.product_id, transaction.location_id, transaction.transaction_type)
+            row = totals.setdefault(key, {
+                "product_id": transaction.product_id,
+                "location_id": transaction.location_id,
+                "transaction_type": transaction.transaction_type,
+                "transaction_count": 0,
+                "quantity_in": 0,
+                "quantity_out": 0
+            })
+            row["transaction_count"] += 1
+            if transaction.quantity > 0:
+                row["quantity_in"] += transaction.quantity
+            else:
+                row["quantity_out"] += transaction.quantity
         
-        summary = {
-            "total_transactions": len(transactions),
-            "in_transactions": len([t for t in transactions if t.transaction_type == TransactionType.IN]),
-            "out_transactions": len([t for t in transactions if t.transaction_type == TransactionType.OUT]),
-            "transfer_transactions": len([t for t in transactions if t.transaction_type == TransactionType.TRANSFER]),
-            "adjustment_transactions": len([t for t in transactions if t.transaction_type == TransactionType.ADJUSTMENT]),
-            "total_quantity_in": sum(t.quantity for t in transactions if t.quantity > 0),
-            "total_quantity_out": abs(sum(t.quantity for t in transactions if t.quantity < 0)),
-        }
+        # Both SQLite and PostgreSQL support INSERT ... ON CONFLICT DO UPDATE
+        dialect = postgresql if self.session.get_bind().dialect.name == "postgresql" else sqlite
+        statement = dialect.insert(TransactionAggregate).values(list(totals.values()))
+        statement = statement.on_conflict_do_update(
+            index_elements=["product_id", "location_id", "transaction_type"],
+            set_={
+                column: getattr(TransactionAggregate, column) + getattr(statement.excluded, column)
+                for column in ("transaction_count", "quantity_in", "quantity_out")
+            }
+        )
+        await self.session.exec(statement)
+    
+    async def _count_updated_rows(self, statement, changes: List[dict]) -> int:
+        """Run a guarded inventory UPDATE for every change and count the rows it matched.
         
-        return summary
+        The executemany rowcount is only summed per row where the driver says so
+        (asyncpg, for one, leaves it at -1); elsewhere each row's UPDATE returns
+        the inventory ID it matched.
+        """
+        if self.session.get_bind().dialect.supports_sane_multi_rowcount:
+            return (await self.session.exec(statement, params=changes)).rowcount
+        
+        inventory_table = Inventory.__table__
+        statement = statement.returning(inventory_table.c.id)
+        updated_ids = set()
+        for change in changes:
+            updated_ids.update((await self.session.exec(statement, params=change)).scalars())
+        return len(updated_ids & {change["inventory_id"] for change in changes})
     
-    # Private helper methods
+    async def _validate_references(self, product_ids: List[int], location_ids: List[int]) -> None:
+        """Check that all referenced products and locations exist in one query."""
+        rows = (await self.session.exec(union_all(
+            select(literal("product"), Product.id).where(Product.id.in_(set(product_ids))),
+            select(literal("location"), Location.id).where(Location.id.in_(set(location_ids)))
+        ))).all()
+        existing_products = {row_id for kind, row_id in rows if kind == "product"}
+        existing_locations = {row_id for kind, row_id in rows if kind == "location"}
+        
+        for product_id in product_ids:
+            if product_id not in existing_products:
+                raise ValueError(f"Product with ID {product_id} not found")
+        
+        for location_id in location_ids:
+            if location_id not in existing_locations:
+                raise ValueError(f"Location with ID {location_id} not found")
     
-    def _validate_transaction(self, transaction_data: TransactionCreate) -> None:
-        """Validate transaction data based on business rules."""
+    async def _validate_transaction(
+        self,
+        transaction_data: TransactionCreate,
+        available: Optional[int] = None
+    ) -> None:
+        """Validate transaction data based on business rules.
+        
+        Pass ``available`` when the available quantity is already known to skip the lookup.
+        """
         if transaction_data.quantity == 0:
             raise ValueError("Transaction quantity cannot be zero")
         
@@ -298,10 +567,11 @@ class TransactionService:
         # Check available stock for OUT transactions
         if (transaction_data.transaction_type in [TransactionType.OUT, TransactionType.TRANSFER] 
             and transaction_data.quantity < 0):
-            available = self.inventory_service.get_available_quantity(
-                transaction_data.product_id, 
-                transaction_data.location_id
-            )
+            if available is None:
+                available = await self._get_available_quantity(
+                    transaction_data.product_id, 
+                    transaction_data.location_id
+                )
             required = abs(transaction_data.quantity)
             
             if available < required:
@@ -309,37 +579,83 @@ class TransactionService:
                     f"Insufficient stock. Available: {available}, Required: {required}"
                 )
     
-    def _process_inventory_update(self, transaction: Transaction) -> None:
-        """Update inventory levels based on transaction."""
-        from ..data.models import InventoryUpdate
-        
-        # Get current inventory
-        inventory = self.inventory_service.get_inventory_by_product_location(
-            transaction.product_id, 
-            transaction.location_id
+    async def _process_inventory_update(self, transaction: Transaction, now: datetime) -> None:
+        """Update inventory levels based on transaction (does not commit)."""
+        product_id, location_id = transaction.product_id, transaction.location_id
+        change = transaction.quantity
+        
+        # Apply the change in one conditional UPDATE so the stock check and the
+        # write cannot interleave with another writer
+        statement = (
+            update(Inventory)
+            .where(Inventory.product_id == product_id)
+            .where(Inventory.location_id == location_id)
+            .values(quantity_on_hand=Inventory.quantity_on_hand + change, last_updated=now)
+            .returning(Inventory.quantity_on_hand)
         )
+        if not settings.allow_negative_inventory:
+            statement = statement.where(Inventory.quantity_on_hand + change >= 0)
+        
+        if (await self.session.exec(statement)).first() is not None:
+            return
         
+        # No row updated: either the record is missing or the change would go negative
+        inventory = await self._get_inventory(product_id, location_id)
+        if inventory:
+            # Re-read the row; raises the negative inventory error, otherwise stock
+            # changed in between and the update is retried
+            await self.session.refresh(inventory)
+            self._apply_quantity_change(inventory.quantity_on_hand, change)
+            return await self._process_inventory_update(transaction, now)
+        
+        # Create inventory record if it doesn't exist
+        inventory = Inventory(
+            product_id=product_id,
+            location_id=location_id,
+            quantity_on_hand=self._apply_quantity_change(0, change),
+            reserved_quantity=0,
+            last_updated=now
+        )
+        self.session.add(inventory)
+        self._inventory_cache[(product_id, location_id)] = inventory
+    
+    async def _get_inventory(self, product_id: int, location_id: int) -> Optional[Inventory]:
+        """Get an inventory record, reusing rows this service has already loaded."""
+        key = (product_id, location_id)
+        inventory = self._inventory_cache.get(key)
+        if inventory is None:
+            inventory = await self.inventory_service.get_inventory_by_product_location(product_id, location_id)
+            if inventory:
+                self._inventory_cache[key] = inventory
+        return inventory
+    
+    async def _get_available_quantity(self, product_id: int, location_id: int) -> int:
+        """Get available quantity (on_hand - reserved) through the inventory cache."""
+        inventory = await self._get_inventory(product_id, location_id)
         if not inventory:
-            # Create inventory record if it doesn't exist
-            inventory = self.inventory_service.update_inventory(
-                transaction.product_id,
-                transaction.location_id,
-                InventoryUpdate(quantity_on_hand=0, reserved_quantity=0)
+            return 0
+        return max(0, inventory.quantity_on_hand - inventory.reserved_quantity)
+    
+    async def _prefetch_inventory(self, pairs: Set[Tuple[int, int]]) -> None:
+        """Load inventory for many (product_id, location_id) pairs into the cache in one query."""
+        missing = [pair for pair in pairs if pair not in self._inventory_cache]
+        if not missing:
+            return
+        for inventory in await self.session.exec(
+            select(Inventory).where(
+                tuple_(Inventory.product_id, Inventory.location_id).in_(missing)
             )
+        ):
+            self._inventory_cache[(inventory.product_id, inventory.location_id)] = inventory
+    
+    def _apply_quantity_change(self, current_quantity: int, change: int) -> int:
+        """Return the new on-hand quantity, rejecting negative inventory unless allowed."""
+        new_quantity = current_quantity + change
         
-        # Calculate new quantity
-        new_quantity = inventory.quantity_on_hand + transaction.quantity
-        
-        # Check for negative inventory
         if new_quantity < 0 and not settings.allow_negative_inventory:
             raise ValueError(
                 f"Transaction would result in negative inventory: {new_quantity}. "
-                f"Current: {inventory.quantity_on_hand}, Transaction: {transaction.quantity}"
+                f"Current: {current_quantity}, Transaction: {change}"
             )
         
-        # Update inventory
-        self.inventory_service.update_inventory(
-            transaction.product_id,
-            transaction.location_id,
-            InventoryUpdate(quantity_on_hand=new_quantity)
-        )
\ No newline at end of file
+        return new_quantity
@@ -1,46 +1,417 @@
 """
 Test configuration and fixtures.
 """
+import asyncio
+import os
+
+# The API tests run against a shared-cache in-memory SQLite database, so they
+# never touch data/inventory.db and commits skip the disk entirely. Each process
+# (each pytest-xdist worker) gets its own. The application engines read
+# DATABASE_URL when src.data.database is first imported below; set it to run
+# the suite against a real database instead.
+if "DATABASE_URL" not in os.environ:
+    _test_database = f"test_{os.environ.get('PYTEST_XDIST_WORKER', 'main')}"
+    os.environ["DATABASE_URL"] = f"sqlite:///file:{_test_database}?mode=memory&cache=shared&uri=true"
+
+import httpx
 import pytest
+import pytest_asyncio
 from sqlmodel import SQLModel, Session, create_engine
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool, StaticPool
+from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi.testclient import TestClient
 from decimal import Decimal
+from collections import namedtuple
 
-from src.data.database import get_session
+from src.data.database import get_async_database_url, get_session_sync
+from src.api.dependencies import get_async_db_session
 from src.api.main import app
-from src.data.models import Supplier, Location, Product, SupplierCreate, LocationCreate, ProductCreate
+from src.services.supplier_service import SupplierService
+from src.services.transaction_service import TransactionService
+from src.data.models import (
+    Supplier, Location, Product, Inventory, Transaction,
+    SupplierCreate, LocationCreate, ProductCreate
+)
+from tests.helpers import make_unique_id, response_json
 
 
-# Test database engine (in-memory SQLite)
-@pytest.fixture(scope="function")
+def enable_sqlite_savepoints(engine) -> None:
+    """Let SQLAlchemy emit BEGIN itself on a SQLite engine so SAVEPOINTs work.
+    
+    The sqlite3 driver's own transaction handling does not support SAVEPOINT,
+    which the per-test rollback fixtures rely on. Pass the sync engine (for an
+    async engine, its ``sync_engine``).
+    """
+    @event.listens_for(engine, "connect")
+    def disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def emit_begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+
+_test_database_url = make_url(os.environ["DATABASE_URL"])
+if _test_database_url.get_backend_name() == "sqlite" and "mode=memory" not in str(_test_database_url):
+    @event.listens_for(Engine, "connect")
+    def skip_sqlite_fsync(dbapi_connection, connection_record):
+        """Stop a file-backed test database from syncing to disk on every commit.
+        
+        Test data is throwaway, so losing the last commits in a crash does not
+        matter. Both pragmas only last for the connection; WAL is left out
+        because it would change the database file itself.
+        """
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+
+# Test database engine (in-memory SQLite), shared by the whole test session
+@pytest.fixture(scope="session")
 def engine():
-    """Create fresh test database engine for each test."""
+    """Create the test database engine and tables once per test session."""
+    # StaticPool keeps one shared connection so every session sees the same
+    # in-memory database instead of a fresh, empty one per connection
     engine = create_engine(
         "sqlite:///:memory:",
         connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
         echo=False
     )
+    enable_sqlite_savepoints(engine)
+
     SQLModel.metadata.create_all(engine)
-    return engine
+    yield engine
+    engine.dispose()
 
 
-@pytest.fixture(scope="function") 
+@pytest.fixture(scope="function")
 def session(engine):
-    """Create fresh test database session for each test."""
-    with Session(engine) as session:
-        yield session
+    """Create a test database session whose changes are rolled back after each test."""
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        # Commits inside the test only release a SAVEPOINT of the outer transaction
+        with Session(bind=connection, join_transaction_mode="create_savepoint") as session:
+            yield session
+        transaction.rollback()
 
 
-@pytest.fixture(scope="function")
-def client(session: Session):
-    """Create test client with fresh database session."""
-    def get_session_override():
-        return session
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def async_engine():
+    """Create the async test database engine (in-memory SQLite) and tables once per test session."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    enable_sqlite_savepoints(engine.sync_engine)
 
-    app.dependency_overrides[get_session] = get_session_override
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def async_session(async_engine):
+    """Create an async test database session whose changes are rolled back after each test.
+    
+    For service-level tests, which call the services directly instead of going
+    through the HTTP stack; they run on the session event loop.
+    """
+    async with async_engine.connect() as connection:
+        transaction = await connection.begin()
+        async with AsyncSession(
+            bind=connection, expire_on_commit=False, join_transaction_mode="create_savepoint"
+        ) as session:
+            yield session
+        await transaction.rollback()
+
+
+@pytest.fixture
+def supplier_service(async_session: AsyncSession) -> SupplierService:
+    """Supplier service on the rolled-back async test session."""
+    return SupplierService(async_session)
+
+
+@pytest.fixture
+def transaction_service(async_session: AsyncSession) -> TransactionService:
+    """Transaction service on the rolled-back async test session."""
+    return TransactionService(async_session)
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Create one test client, and run application startup once, for the whole test session."""
+    # The API sessions come from the application's own engines; tests run
+    # against that database (per xdist worker), so there is nothing to override here
     with TestClient(app) as client:
         yield client
-    app.dependency_overrides.clear()
+
+
+@pytest.fixture(scope="function")
+def db_session(client: TestClient):
+    """Run the test's API requests in one transaction that is rolled back afterwards.
+    
+    Rows the test creates never persist, so it can use fixed names and later
+    tests do not scan an ever-growing database. Only requests made through the
+    session-wide ``client`` are covered; rows the test needs from other fixtures
+    must be committed before it starts (higher-scoped fixtures always are).
+    """
+    rollback_engine = create_async_engine(get_async_database_url(), poolclass=NullPool)
+    if rollback_engine.dialect.name == "sqlite":
+        enable_sqlite_savepoints(rollback_engine.sync_engine)
+
+    # The connection must live on the client's event loop, where requests run
+    async def begin():
+        connection = await rollback_engine.connect()
+        return connection, await connection.begin()
+
+    connection, transaction = client.portal.call(begin)
+
+    async def get_rollback_session():
+        # Service commits only release a SAVEPOINT of the outer transaction
+        async with AsyncSession(
+            bind=connection, expire_on_commit=False, join_transaction_mode="create_savepoint"
+        ) as session:
+            yield session
+
+    app.dependency_overrides[get_async_db_session] = get_rollback_session
+    try:
+        yield connection
+    finally:
+        del app.dependency_overrides[get_async_db_session]
+
+        async def rollback():
+            await transaction.rollback()
+            await connection.close()
+            await rollback_engine.dispose()
+
+        client.portal.call(rollback)
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def async_client(client: TestClient):
+    """Async client for overlapping independent requests with asyncio.gather.
+    
+    Shared by the whole test session; tests using it run on the session event loop
+    (``@pytest.mark.asyncio(loop_scope="session")``).
+    """
+    # Startup (table creation) already ran for the session-wide test client
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+        yield async_client
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def baseline_ids(async_client: httpx.AsyncClient):
+    """Create one supplier, location and product shared by the whole test session.
+    
+    Tests that only need a valid triple use these instead of creating their own.
+    Inventory and transactions on them accumulate across tests, so assertions
+    must not assume the rows start out empty.
+    """
+    unique_id = make_unique_id()
+    
+    # The supplier and location are independent; only the product needs the supplier
+    supplier_response, location_response = await asyncio.gather(
+        async_client.post("/api/v1/suppliers/", json={
+            "name": f"Baseline Supplier {unique_id}",
+            "lead_time_days": 5
+        }),
+        async_client.post("/api/v1/locations/", json={
+            "name": f"Baseline Location {unique_id}",
+            "code": f"BASE{unique_id[:4].upper()}"
+        })
+    )
+    supplier_id = response_json(supplier_response)["id"]
+    location_id = response_json(location_response)["id"]
+    
+    product_response = await async_client.post("/api/v1/products/", json={
+        "sku": f"BASE-{unique_id}",
+        "name": f"Baseline Product {unique_id}",
+        "unit_cost": 30.00,
+        "supplier_id": supplier_id
+    })
+    product_id = response_json(product_response)["id"]
+    
+    return supplier_id, location_id, product_id
+
+
+@pytest.fixture(scope="session")
+def stocked_location_id(client: TestClient, baseline_ids):
+    """Return the baseline location after receiving stock into it once per test session.
+    
+    Shared tests only add stock there or set it to positive levels, so it never
+    becomes empty.
+    """
+    supplier_id, location_id, product_id = baseline_ids
+    
+    response = client.post("/api/v1/transactions/receipt", params={
+        "product_id": product_id,
+        "location_id": location_id,
+        "quantity": 50,
+        "user_id": "baseline_user"
+    })
+    assert response.status_code == 200
+    
+    return location_id
+
+
+Seeded = namedtuple("Seeded", ["supplier_ids", "location_ids", "product_ids", "transaction_ids"])
+
+
+def seed_rows(session: Session, suppliers=(), locations=(), products=(), inventory=(), transactions=()) -> Seeded:
+    """Insert rows straight into the database, one batched INSERT per table.
+    
+    Products may reference a supplier seeded in the same call with a ``supplier``
+    index; inventory and transaction rows likewise with ``product``/``location``.
+    Rows are inserted as given: transactions do not change inventory levels or
+    the running transaction totals behind the summary endpoint.
+    """
+    def resolve(row: dict, ids: dict) -> dict:
+        row = dict(row)
+        for key, seeded_ids in ids.items():
+            if key in row:
+                row[f"{key}_id"] = seeded_ids[row.pop(key)]
+        return row
+
+    def insert_all(model, rows) -> list:
+        instances = [model(**row) for row in rows]
+        session.add_all(instances)
+        session.flush()
+        return [instance.id for instance in instances]
+
+    supplier_ids = insert_all(Supplier, suppliers)
+    location_ids = insert_all(Location, locations)
+    product_ids = insert_all(Product, [resolve(row, {"supplier": supplier_ids}) for row in products])
+    refs = {"product": product_ids, "location": location_ids}
+    insert_all(Inventory, [resolve(row, refs) for row in inventory])
+    transaction_ids = insert_all(Transaction, [resolve(row, refs) for row in transactions])
+    session.commit()
+
+    return Seeded(supplier_ids, location_ids, product_ids, transaction_ids)
+
+
+@pytest.fixture(scope="function")
+def seed(client: TestClient):
+    """Seed the application database directly, bypassing the HTTP stack."""
+    with get_session_sync() as session:
+        yield lambda **rows: seed_rows(session, **rows)
+
+
+@pytest.fixture
+def async_seed(async_session: AsyncSession):
+    """Like ``seed``, but the rows go into the rolled-back ``async_session``."""
+    async def seed(**rows) -> Seeded:
+        return await async_session.run_sync(lambda sync_session: seed_rows(sync_session, **rows))
+
+    return seed
+
+
+@pytest.fixture(scope="module")
+def shared_supplier(client: TestClient) -> int:
+    """Seed one supplier shared by every test in a module and return its ID."""
+    with get_session_sync() as session:
+        seeded = seed_rows(session, suppliers=[
+            {"name": f"Shared Supplier {make_unique_id()}", "lead_time_days": 5}
+        ])
+    return seeded.supplier_ids[0]
+
+
+WorkflowBundle = namedtuple("WorkflowBundle", ["supplier_id", "location_id", "product_id", "sku"])
+
+
+@pytest.fixture(scope="module")
+def workflow_bundle(client: TestClient) -> WorkflowBundle:
+    """Seed one supplier, location and unstocked product shared by a module's tests.
+    
+    The rows are committed, so tests that change them should run inside
+    ``db_session`` to leave the product unstocked for the next test.
+    """
+    unique_id = make_unique_id()
+    sku = f"BDL-{unique_id}"
+    with get_session_sync() as session:
+        seeded = seed_rows(
+            session,
+            suppliers=[{"name": f"Bundle Supplier {unique_id}", "lead_time_days": 5}],
+            locations=[{"name": f"Bundle Location {unique_id}", "code": f"BL{unique_id[:6].upper()}"}],
+            products=[{
+                "sku": sku,
+                "name": f"Bundle Product {unique_id}",
+                "unit_cost": Decimal("10.00"),
+                "supplier": 0,
+                "reorder_point": 5
+            }]
+        )
+    [supplier_id], [location_id], [product_id] = (
+        seeded.supplier_ids, seeded.location_ids, seeded.product_ids
+    )
+    return WorkflowBundle(supplier_id, location_id, product_id, sku)
+
+
+@pytest.fixture(scope="module")
+def location_pool(client: TestClient) -> list:
+    """Seed a pool of locations shared by every test in a module and return their IDs.
+
+    Inventory is tracked per product and location, so tests stay isolated by
+    stocking a product of their own from ``product_factory``.
+    """
+    unique_id = make_unique_id()
+    with get_session_sync() as session:
+        seeded = seed_rows(session, locations=[
+            {"name": f"Pool Location {index} {unique_id}", "code": f"POOL{index}{unique_id[:5].upper()}"}
+            for index in range(2)
+        ])
+    return seeded.location_ids
+
+
+@pytest.fixture(scope="function")
+def unique_id() -> str:
+    """Return a short unique ID for namespacing the test's data."""
+    return make_unique_id()
+
+
+@pytest.fixture(scope="function")
+def supplier_factory(client: TestClient, unique_id: str):
+    """Return a callable that creates a supplier through the API and returns its JSON.
+
+    Names are ``"{label} Supplier {unique_id}"``, so a test creating several
+    passes a distinct label each time and can still select them all by its
+    ``unique_id``. Keyword arguments override the template, e.g. ``performance_rating``.
+    """
+    def create_supplier(label: str = "Test", **overrides) -> dict:
+        response = client.post("/api/v1/suppliers/", json={
+            "name": f"{label} Supplier {unique_id}",
+            "lead_time_days": 5,
+            **overrides
+        })
+        assert response.status_code == 200, response.text
+        return response_json(response)
+
+    return create_supplier
+
+
+@pytest.fixture(scope="function")
+def product_factory(client: TestClient, shared_supplier, location_pool):
+    """Return a callable that creates a fresh product of the shared supplier and returns its ID.
+
+    Products go through the API so their inventory records are created at the
+    pooled locations. Keyword arguments override the template, e.g. ``reorder_point``.
+    """
+    def create_product(**overrides) -> int:
+        unique_id = make_unique_id()
+        response = client.post("/api/v1/products/", json={
+            "sku": f"PRD-{unique_id}",
+            "name": f"Test Product {unique_id}",
+            "unit_cost": 10.0,
+            "supplier_id": shared_supplier,
+            **overrides
+        })
+        assert response.status_code == 200, response.text
+        return response_json(response)["id"]
+
+    return create_product
 
 
 @pytest.fixture(name="sample_supplier")
@@ -99,7 +470,7 @@ def sample_product_fixture(session: Session, sample_supplier: Supplier):
 @pytest.fixture(name="sample_data")
 def sample_data_fixture(session: Session):
     """Create complete sample data set for testing."""
-    # Create supplier
+    # Create supplier and location
     supplier = Supplier(
         name="Complete Test Supplier",
         contact_person="Jane Smith",
@@ -108,20 +479,15 @@ def sample_data_fixture(session: Session):
         payment_terms="Net 15",
         minimum_order_qty=20
     )
-    session.add(supplier)
-    session.commit()
-    session.refresh(supplier)
-    
-    # Create location
     location = Location(
         name="Complete Test Location",
         code="COMP",
         address="456 Complete Ave, Complete City",
         warehouse_type="Warehouse"
     )
-    session.add(location)
-    session.commit()
-    session.refresh(location)
+    session.add_all([supplier, location])
+    # Flush to assign the supplier ID needed by the product
+    session.flush()
     
     # Create product
     product = Product(
@@ -137,7 +503,8 @@ def sample_data_fixture(session: Session):
     )
     session.add(product)
     session.commit()
-    session.refresh(product)
+    for instance in (supplier, location, product):
+        session.refresh(instance)
     
     return {
         "supplier": supplier,
@@ -0,0 +1,43 @@
+"""
+Shared helpers for tests.
+"""
+import itertools
+import random
+
+try:
+    import orjson
+except ImportError:  # optional (dev extra); fall back to httpx's stdlib decoding
+    orjson = None
+
+# A per-run random offset keeps names distinct from earlier runs against the
+# same database; a counter is far cheaper than uuid4() for everything after that
+_unique_ids = itertools.count(random.getrandbits(32))
+
+
+def make_unique_id() -> str:
+    """Return a short unique ID for namespacing test data.
+    
+    Digits are reversed so even short prefixes (as used in location codes)
+    differ between consecutive IDs.
+    """
+    return f"{next(_unique_ids) & 0xffffffff:08x}"[::-1]
+
+
+def response_json(response):
+    """Decode a response body, with orjson when it is installed."""
+    if orjson is None:
+        return response.json()
+    return orjson.loads(response.content)
+
+
+def assert_keys(data: dict, keys) -> None:
+    """Assert that a response payload contains every one of the given keys."""
+    missing = set(keys).difference(data)
+    assert not missing, f"missing keys: {sorted(missing)}"
+
+
+def get_inventory_by_location(client, product_id: int) -> dict:
+    """Fetch every inventory record of a product in one request, keyed by location ID."""
+    response = client.get("/api/v1/inventory/", params={"product_id": product_id})
+    assert response.status_code == 200
+    return {record["location_id"]: record for record in response_json(response)}
@@ -1,40 +1,19 @@
 """
-Test advanced transaction types and error handling.
+Test advanced transaction types.
 """
-import uuid
+import pytest
 from fastapi.testclient import TestClient
 
+from tests.helpers import get_inventory_by_location, response_json
 
-def test_stock_transfer_workflow(client: TestClient):
+pytestmark = pytest.mark.integration
+
+
+def test_stock_transfer_workflow(client: TestClient, product_factory, location_pool, unique_id):
     """Test stock transfer between locations."""
-    unique_id = str(uuid.uuid4())[:8]
-    
-    # Setup: supplier, 2 locations, product
-    supplier_response = client.post("/api/v1/suppliers/", json={
-        "name": f"Transfer Supplier {unique_id}",
-        "lead_time_days": 5
-    })
-    supplier_id = supplier_response.json()["id"]
-    
-    location1_response = client.post("/api/v1/locations/", json={
-        "name": f"Source Location {unique_id}",
-        "code": f"SRC{unique_id[:5].upper()}"
-    })
-    location1_id = location1_response.json()["id"]
-    
-    location2_response = client.post("/api/v1/locations/", json={
-        "name": f"Dest Location {unique_id}",
-        "code": f"DST{unique_id[:5].upper()}"
-    })
-    location2_id = location2_response.json()["id"]
-    
-    product_response = client.post("/api/v1/products/", json={
-        "sku": f"TXF-{unique_id}",
-        "name": f"Transfer Product {unique_id}",
-        "unit_cost": 15.0,
-        "supplier_id": supplier_id
-    })
-    product_id = product_response.json()["id"]
+    # Setup: a fresh product moved between two shared locations
+    location1_id, location2_id = location_pool[:2]
+    product_id = product_factory()
     
     # Add initial stock to source location
     receipt_response = client.post(
@@ -48,12 +27,10 @@ def test_stock_transfer_workflow(client: TestClient):
     )
     assert receipt_response.status_code == 200
     
-    # Verify initial stock
-    source_inventory = client.get(f"/api/v1/inventory/{product_id}/{location1_id}").json()
-    assert source_inventory["quantity_on_hand"] == 100
-    
-    dest_inventory = client.get(f"/api/v1/inventory/{product_id}/{location2_id}").json()
-    assert dest_inventory["quantity_on_hand"] == 0
+    # Verify initial stock at both locations with one request
+    inventory = get_inventory_by_location(client, product_id)
+    assert inventory[location1_id]["quantity_on_hand"] == 100
+    assert inventory[location2_id]["quantity_on_hand"] == 0
     
     # Process stock transfer
     transfer_response = client.post(
@@ -69,12 +46,11 @@ def test_stock_transfer_workflow(client: TestClient):
     )
     assert transfer_response.status_code == 200
     
-    transfer_data = transfer_response.json()
-    assert len(transfer_data) == 2  # Should return 2 transactions (OUT and IN)
+    transfer_data = response_json(transfer_response)
     
     # Verify transfer transactions
-    out_txn = next(t for t in transfer_data if t["quantity"] < 0)
-    in_txn = next(t for t in transfer_data if t["quantity"] > 0)
+    out_txn = transfer_data["out_transaction"]
+    in_txn = transfer_data["in_transaction"]
     
     assert out_txn["location_id"] == location1_id
     assert out_txn["quantity"] == -30
@@ -82,116 +58,16 @@ def test_stock_transfer_workflow(client: TestClient):
     assert in_txn["quantity"] == 30
     
     # Verify final inventory levels
-    final_source = client.get(f"/api/v1/inventory/{product_id}/{location1_id}").json()
-    final_dest = client.get(f"/api/v1/inventory/{product_id}/{location2_id}").json()
-    
-    assert final_source["quantity_on_hand"] == 70  # 100 - 30
-    assert final_dest["quantity_on_hand"] == 30    # 0 + 30
+    final_inventory = get_inventory_by_location(client, product_id)
+    assert final_inventory[location1_id]["quantity_on_hand"] == 70  # 100 - 30
+    assert final_inventory[location2_id]["quantity_on_hand"] == 30  # 0 + 30
 
 
-def test_error_handling_comprehensive(client: TestClient):
-    """Test comprehensive error handling scenarios."""
-    unique_id = str(uuid.uuid4())[:8]
-    
-    # Setup basic entities
-    supplier_response = client.post("/api/v1/suppliers/", json={
-        "name": f"Error Test Supplier {unique_id}",
-        "lead_time_days": 5
-    })
-    supplier_id = supplier_response.json()["id"]
-    
-    location_response = client.post("/api/v1/locations/", json={
-        "name": f"Error Test Location {unique_id}",
-        "code": f"ERR{unique_id[:5].upper()}"
-    })
-    location_id = location_response.json()["id"]
-    
-    product_response = client.post("/api/v1/products/", json={
-        "sku": f"ERR-{unique_id}",
-        "name": f"Error Test Product {unique_id}",
-        "unit_cost": 10.0,
-        "supplier_id": supplier_id
-    })
-    product_id = product_response.json()["id"]
-    
-    # Test 1: Insufficient stock for shipment
-    insufficient_shipment = client.post(
-        "/api/v1/transactions/shipment",
-        params={
-            "product_id": product_id,
-            "location_id": location_id,
-            "quantity": 50,  # No stock available
-            "user_id": "error_user"
-        }
-    )
-    assert insufficient_shipment.status_code == 400
-    assert "insufficient" in insufficient_shipment.json()["detail"].lower()
-    
-    # Test 2: Invalid product ID  
-    invalid_product = client.post(
-        "/api/v1/transactions/receipt",
-        params={
-            "product_id": 99999,  # Non-existent
-            "location_id": location_id,
-            "quantity": 10,
-            "user_id": "error_user"
-        }
-    )
-    # Should return 404 or 400 depending on implementation
-    assert invalid_product.status_code in [400, 404]
-    
-    # Test 3: Invalid location ID
-    invalid_location = client.post(
-        "/api/v1/transactions/receipt",
-        params={
-            "product_id": product_id,
-            "location_id": 99999,  # Non-existent
-            "quantity": 10,
-            "user_id": "error_user"
-        }
-    )
-    # Should return 404 or 400 depending on implementation  
-    assert invalid_location.status_code in [400, 404]
-    
-    # Test 4: Transfer to same location
-    same_location_transfer = client.post(
-        "/api/v1/transactions/transfer",
-        params={
-            "product_id": product_id,
-            "from_location_id": location_id,
-            "to_location_id": location_id,  # Same as from
-            "quantity": 10,
-            "user_id": "error_user"
-        }
-    )
-    assert same_location_transfer.status_code == 400
-    assert "same" in same_location_transfer.json()["detail"].lower()
-
-
-def test_inventory_reservations(client: TestClient):
+def test_inventory_reservations(client: TestClient, product_factory, location_pool):
     """Test inventory reservation and release functionality."""
-    unique_id = str(uuid.uuid4())[:8]
-    
     # Setup
-    supplier_response = client.post("/api/v1/suppliers/", json={
-        "name": f"Reserve Supplier {unique_id}",
-        "lead_time_days": 5
-    })
-    supplier_id = supplier_response.json()["id"]
-    
-    location_response = client.post("/api/v1/locations/", json={
-        "name": f"Reserve Location {unique_id}",
-        "code": f"RES{unique_id[:5].upper()}"
-    })
-    location_id = location_response.json()["id"]
-    
-    product_response = client.post("/api/v1/products/", json={
-        "sku": f"RES-{unique_id}",
-        "name": f"Reserve Product {unique_id}",
-        "unit_cost": 20.0,
-        "supplier_id": supplier_id
-    })
-    product_id = product_response.json()["id"]
+    location_id = location_pool[0]
+    product_id = product_factory()
     
     # Add initial stock
     client.post(
@@ -212,7 +88,7 @@ def test_inventory_reservations(client: TestClient):
     assert reserve_response.status_code == 200
     
     # Verify reservation
-    inventory_after_reserve = client.get(f"/api/v1/inventory/{product_id}/{location_id}").json()
+    inventory_after_reserve = response_json(client.get(f"/api/v1/inventory/{product_id}/{location_id}"))
     assert inventory_after_reserve["reserved_quantity"] == 25
     assert inventory_after_reserve["available_quantity"] == 75
     
@@ -231,38 +107,17 @@ def test_inventory_reservations(client: TestClient):
     assert release_response.status_code == 200
     
     # Verify release
-    inventory_after_release = client.get(f"/api/v1/inventory/{product_id}/{location_id}").json()
+    inventory_after_release = response_json(client.get(f"/api/v1/inventory/{product_id}/{location_id}"))
     assert inventory_after_release["reserved_quantity"] == 10  # 25 - 15
     assert inventory_after_release["available_quantity"] == 90  # 100 - 10
 
 
-def test_low_stock_alerts(client: TestClient):
+def test_low_stock_alerts(client: TestClient, product_factory, location_pool):
     """Test low stock alert functionality."""
-    unique_id = str(uuid.uuid4())[:8]
-    
-    # Create supplier and location
-    supplier_response = client.post("/api/v1/suppliers/", json={
-        "name": f"Alert Supplier {unique_id}",
-        "lead_time_days": 5
-    })
-    supplier_id = supplier_response.json()["id"]
-    
-    location_response = client.post("/api/v1/locations/", json={
-        "name": f"Alert Location {unique_id}",
-        "code": f"ALT{unique_id[:5].upper()}"
-    })
-    location_id = location_response.json()["id"]
+    location_id = location_pool[0]
     
     # Create product with low reorder point
-    product_response = client.post("/api/v1/products/", json={
-        "sku": f"ALT-{unique_id}",
-        "name": f"Alert Product {unique_id}",
-        "unit_cost": 30.0,
-        "supplier_id": supplier_id,
-        "reorder_point": 20,  # Low reorder point
-        "reorder_quantity": 100
-    })
-    product_id = product_response.json()["id"]
+    product_id = product_factory(reorder_point=20, reorder_quantity=100)  # Low reorder point
     
     # Add stock above reorder point
     client.post(
@@ -276,11 +131,9 @@ def test_low_stock_alerts(client: TestClient):
     )
     
     # Check no alerts initially
-    alerts_response = client.get("/api/v1/inventory/alerts/low-stock")
+    alerts_response = client.get("/api/v1/inventory/alerts/low-stock", params={"product_id": product_id})
     assert alerts_response.status_code == 200, f"Expected 200, got {alerts_response.status_code}: {alerts_response.text}"
-    initial_alerts = alerts_response.json()
-    our_alerts = [alert for alert in initial_alerts if alert["product_id"] == product_id]
-    assert len(our_alerts) == 0  # Should not be in low stock
+    assert response_json(alerts_response) == []  # Should not be in low stock
     
     # Ship stock to bring below reorder point
     client.post(
@@ -294,12 +147,11 @@ def test_low_stock_alerts(client: TestClient):
     )
     
     # Check for low stock alerts
-    final_alerts_response = client.get("/api/v1/inventory/alerts/low-stock")
-    final_alerts = final_alerts_response.json()
-    our_final_alerts = [alert for alert in final_alerts if alert["product_id"] == product_id]
+    final_alerts_response = client.get("/api/v1/inventory/alerts/low-stock", params={"product_id": product_id})
+    final_alerts = response_json(final_alerts_response)
     
-    assert len(our_final_alerts) > 0  # Should now be in low stock
-    alert = our_final_alerts[0]
+    assert len(final_alerts) == 1  # Should now be in low stock
+    alert = final_alerts[0]
     assert alert["current_available"] == 15
     assert alert["reorder_point"] == 20
     assert alert["shortage"] == 5  # 20 - 15
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""
+Service-level supplier tests.
+
+These call SupplierService directly on a rolled-back in-memory session, so
+they skip routing, validation and JSON encoding; the HTTP layer is covered
+end to end by the supplier CRUD lifecycle test in test_inventory_api.py.
+"""
+from typing import List
+
+import pytest
+import pytest_asyncio
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.data.models import Supplier, SupplierCreate
+from src.services.supplier_service import SupplierService
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def rated_suppliers(async_session: AsyncSession) -> List[Supplier]:
+    """Add three suppliers rated 3.0, 4.0 and 5.0 in one flush."""
+    suppliers = [
+        Supplier(name=f"Filter Supplier {rating}", performance_rating=rating, lead_time_days=5)
+        for rating in (3.0, 4.0, 5.0)
+    ]
+    async_session.add_all(suppliers)
+    await async_session.commit()
+    return suppliers
+
+
+class TestSupplierService:
+    """Test supplier business rules without the HTTP stack."""
+
+    async def test_supplier_validation_errors(self, supplier_service: SupplierService):
+        """Test duplicate names are rejected and missing suppliers are not found."""
+        supplier_data = SupplierCreate(name="Duplicate Supplier", lead_time_days=5)
+
+        supplier = await supplier_service.create_supplier(supplier_data)
+        assert supplier.id is not None
+        assert supplier.is_active == True
+
+        with pytest.raises(ValueError, match="already exists"):
+            await supplier_service.create_supplier(supplier_data)
+
+        assert await supplier_service.get_supplier(99999) is None
+
+    @pytest.mark.parametrize("min_rating, expected_ratings", [
+        (3.0, [3.0, 4.0, 5.0]),
+        (4.0, [4.0, 5.0]),
+        (5.0, [5.0]),
+    ])
+    async def test_rating_filter(
+        self, supplier_service: SupplierService, rated_suppliers, min_rating, expected_ratings
+    ):
+        """Test the minimum rating filter keeps exactly the suppliers at or above it."""
+        # The session only holds this test's suppliers, so results are exact
+        filtered = await supplier_service.list_suppliers(min_rating=min_rating)
+        assert sorted(s.performance_rating for s in filtered) == expected_ratings
+
+    async def test_pagination(self, supplier_service: SupplierService, rated_suppliers):
+        """Test supplier pages do not overlap and stop at the last supplier."""
+        first_page = await supplier_service.list_suppliers(skip=0, limit=2)
+        second_page = await supplier_service.list_suppliers(skip=2, limit=2)
+        assert len(first_page) == 2
+        assert len(second_page) == 1
+        assert {s.id for s in first_page}.isdisjoint(s.id for s in second_page)
+
+    async def test_statistics(self, supplier_service: SupplierService, rated_suppliers):
+        """Test statistics on a connection-bound session see the session's own suppliers."""
+        # The session is bound to the test's rollback connection, so the statistics
+        # queries run one after another on it rather than on separate sessions
+        statistics = await supplier_service.get_supplier_statistics()
+        assert statistics["total_suppliers"] == 3
+        assert statistics["average_performance_rating"] == 4.0
+        assert [s["performance_rating"] for s in statistics["top_suppliers"]] == [5.0, 4.0, 3.0]
@@ -0,0 +1,90 @@
+"""
+Service-level transaction tests.
+
+These call TransactionService directly on a rolled-back in-memory session to
+check the stock rules; test_error_handling in test_inventory_api.py covers how
+the HTTP layer maps the resulting errors to status codes.
+"""
+import pytest
+import pytest_asyncio
+from decimal import Decimal
+from sqlmodel import select
+
+from src.data.models import Inventory, TransactionCreate, TransactionType
+from src.services.transaction_service import TransactionService
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def unstocked(async_seed):
+    """Add a product with no stock and two locations."""
+    return await async_seed(
+        suppliers=[{"name": "Service Supplier", "lead_time_days": 5}],
+        locations=[{"name": "Service Location A", "code": "SVCA"},
+                   {"name": "Service Location B", "code": "SVCB"}],
+        products=[{"sku": "SVC-001", "name": "Service Product",
+                   "unit_cost": Decimal("10.00"), "supplier": 0}]
+    )
+
+
+class TestTransactionService:
+    """Test transaction business rules without the HTTP stack."""
+
+    async def test_insufficient_stock(self, transaction_service: TransactionService, unstocked):
+        """Test shipments and transfers cannot take more than is available."""
+        [product_id], (location_id, other_location_id) = unstocked.product_ids, unstocked.location_ids
+
+        with pytest.raises(ValueError, match="Insufficient stock"):
+            await transaction_service.process_stock_shipment(product_id, location_id, 50)
+
+        with pytest.raises(ValueError, match="Insufficient stock"):
+            await transaction_service.process_stock_transfer(product_id, location_id, other_location_id, 50)
+
+    async def test_unknown_references(self, transaction_service: TransactionService, unstocked):
+        """Test receipts for a missing product or location are not found."""
+        [product_id], (location_id, _) = unstocked.product_ids, unstocked.location_ids
+
+        with pytest.raises(ValueError, match="Product with ID 99999 not found"):
+            await transaction_service.process_stock_receipt(99999, location_id, 10)
+
+        with pytest.raises(ValueError, match="Location with ID 99999 not found"):
+            await transaction_service.process_stock_receipt(product_id, 99999, 10)
+
+    async def test_transfer_to_same_location(self, transaction_service: TransactionService, unstocked):
+        """Test a transfer needs distinct source and destination locations."""
+        [product_id], (location_id, _) = unstocked.product_ids, unstocked.location_ids
+
+        with pytest.raises(ValueError, match="cannot be the same"):
+            await transaction_service.process_stock_transfer(product_id, location_id, location_id, 10)
+
+    async def test_transfer_without_executemany_rowcount(
+        self, transaction_service: TransactionService, async_session, unstocked, monkeypatch
+    ):
+        """Test transfers between stocked locations when the driver reports no batch rowcount."""
+        [product_id], (location_id, other_location_id) = unstocked.product_ids, unstocked.location_ids
+        await transaction_service.process_stock_receipt(product_id, location_id, 100)
+        await transaction_service.process_stock_receipt(product_id, other_location_id, 10)
+
+        # Like asyncpg, whose executemany leaves rowcount at -1
+        monkeypatch.setattr(async_session.get_bind().dialect, "supports_sane_multi_rowcount", False)
+        await transaction_service.process_stock_transfer(product_id, location_id, other_location_id, 30)
+
+        on_hand = dict((await async_session.exec(
+            select(Inventory.location_id, Inventory.quantity_on_hand).where(Inventory.product_id == product_id)
+        )).all())
+        assert on_hand == {location_id: 70, other_location_id: 40}
+
+    async def test_batch_keeps_input_order(self, transaction_service: TransactionService, unstocked):
+        """Test batch transactions come back in the order they were given."""
+        [product_id], (location_id, _) = unstocked.product_ids, unstocked.location_ids
+        batch = [
+            TransactionCreate(product_id=product_id, location_id=location_id,
+                              transaction_type=transaction_type, quantity=quantity)
+            for transaction_type, quantity in [
+                (TransactionType.IN, 50), (TransactionType.OUT, -20), (TransactionType.ADJUSTMENT, -5)
+            ]
+        ]
+
+        transactions = await transaction_service.create_bulk_transactions(batch)
+        assert [t.quantity for t in transactions] == [50, -20, -5]
@@ -83,7 +83,8 @@ export function useTransactions() {
   const processTransfer = async (data: StockTransferRequest): Promise<Transaction[] | null> => {
     try {
       setError(null);
-      const newTransactions = await api.transactions.processTransfer(data);
+      const transfer = await api.transactions.processTransfer(data);
+      const newTransactions = [transfer.out_transaction, transfer.in_transaction];
       setTransactions(prev => [...newTransactions, ...prev]);
       return newTransactions;
     } catch (err) {
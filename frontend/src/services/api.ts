@@ -193,6 +193,11 @@ export interface Transaction {
   created_at: string;
 }
 
+export interface StockTransfer {
+  out_transaction: Transaction;
+  in_transaction: Transaction;
+}
+
 export interface TransactionCreate {
   product_id: number;
   location_id: number;
@@ -393,7 +398,7 @@ export const api = {
       }).toString()}`, {
         method: 'POST',
       }),
-    processTransfer: (data: StockTransferRequest): Promise<Transaction[]> =>
+    processTransfer: (data: StockTransferRequest): Promise<StockTransfer> =>
       apiRequest(`/transactions/transfer?${new URLSearchParams({
         product_id: data.product_id.toString(),
         from_location_id: data.from_location_id.toString(),